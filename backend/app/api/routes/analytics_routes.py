@@ -0,0 +1,32 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.services.analytics.analytics_service import DEFAULT_TOP_LIMIT, MAX_TOP_LIMIT, AnalyticsService
+
+router = APIRouter()
+service = AnalyticsService()
+
+# 1. Highest-Risk Drivers (by active points)
+@router.get("/top_risk")
+async def get_top_risk_drivers(limit: int = Query(DEFAULT_TOP_LIMIT, ge=1, le=MAX_TOP_LIMIT)):
+    return await service.get_top_risk_drivers(limit)
+
+# 2. Violation Counts per Type (inclusive dates, default: last 30 days)
+@router.get("/violation_types")
+async def get_violation_type_counts(start: Optional[date] = None, end: Optional[date] = None):
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    try:
+        return await service.get_violation_type_counts(
+            datetime.combine(start, datetime.min.time()),
+            datetime.combine(end + timedelta(days=1), datetime.min.time())
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# 3. Drivers per Risk Level
+@router.get("/risk_distribution")
+async def get_risk_distribution():
+    return await service.get_risk_distribution()
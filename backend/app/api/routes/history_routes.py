@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.history.history_service import (
+    DEFAULT_PAGE_SIZE, EXPORT_KINDS, MAX_PAGE_SIZE, HistoryService
+)
+
+router = APIRouter()
+service = HistoryService()
+
+def _local(dt):
+    # Records store naive local timestamps (datetime.now())
+    return dt.astimezone().replace(tzinfo=None) if dt and dt.tzinfo else dt
+
+# 1. Paginated Violation History (newest first, keyset cursor)
+@router.get("/user/{plate_no}/violations")
+async def get_violation_history(
+    plate_no: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    try:
+        data = await service.get_violation_history(plate_no, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if data is None:
+        raise HTTPException(status_code=404, detail="Vehicle not found. Please register first.")
+    return data
+
+# 2. Streaming NDJSON Export (auditors)
+@router.get("/export")
+async def export_records(
+    kind: Literal["violations", "rewards", "all"] = "all",
+    plate_no: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    type: Optional[str] = None
+):
+    kinds = EXPORT_KINDS if kind == "all" else (kind,)
+    return StreamingResponse(
+        service.export_ndjson(kinds, plate_no, _local(start), _local(end), type),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="goodroad-export.ndjson"'}
+    )
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics.metrics import CONTENT_TYPE, registry
+from app.services.metrics.sampling_profiler import sampling_profiler
+
+router = APIRouter()
+
+# 1. Prometheus Scrape Endpoint
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+# 2. Sampling Profiler Output (collapsed stacks; needs SAMPLING_PROFILER=1)
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile(reset: bool = False):
+    if not sampling_profiler.running:
+        raise HTTPException(status_code=404, detail="Sampling profiler is off (set SAMPLING_PROFILER=1)")
+    return PlainTextResponse(sampling_profiler.collapsed(reset))
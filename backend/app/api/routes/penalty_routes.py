@@ -1,9 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from typing import List
+from app.models.schemas import ViolationEvent
+from app.services.ingestion.ingestion_service import EVENT_ACCEPTED, IngestionService
 from app.services.penalty.penalty_service import PenaltyService
+from app.services.penalty.profile_cache import profile_cache, etag_matches
+from app.services.ai.email_worker import email_worker_pool
 
 router = APIRouter()
 service = PenaltyService()
+ingestion = IngestionService()
+
+MAX_BATCH_SIZE = 5000
 
 # Request Models
 class VehicleReg(BaseModel):
@@ -18,24 +28,80 @@ class ViolationAdd(BaseModel):
 
 # 1. Register Vehicle Endpoint
 @router.post("/register")
-def register_vehicle(data: VehicleReg):
-    result = service.register_vehicle(data.plate_no, data.owner_name, data.email, data.vehicle_type)
+async def register_vehicle(data: VehicleReg):
+    result = await service.register_vehicle(data.plate_no, data.owner_name, data.email, data.vehicle_type)
     if result["status"] == "error":
         raise HTTPException(status_code=400, detail=result["msg"])
     return result
 
 # 2. Add Violation Endpoint
 @router.post("/add")
-def add_violation(data: ViolationAdd):
+async def add_violation(data: ViolationAdd):
     try:
-        return service.add_violation(data.plate_no, data.violation_code)
+        result = await service.add_violation(data.plate_no, data.violation_code)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    email_worker_pool.notify()
+    return result
+
+# 2b. Add Violations in Bulk (dashcam batches)
+@router.post("/add_batch")
+async def add_violation_batch(data: List[ViolationAdd]):
+    if len(data) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE} events)")
+    results = await service.add_violations_batch([item.model_dump() for item in data])
+    email_worker_pool.notify()
+    return {
+        "received": len(data),
+        "inserted": sum(1 for r in results if r["status"] == "success"),
+        "results": results
+    }
+
+# 2c. Dashcam Event Submission (idempotent on eventId, deduplicated per incident)
+@router.post("/events")
+async def submit_violation_event(data: ViolationEvent):
+    try:
+        result = await ingestion.ingest(data.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result["status"] == EVENT_ACCEPTED:
+        email_worker_pool.notify()
+    return result
+
+# 2d. Poll AI Email Status for a Violation
+@router.get("/violation/{violation_id}/email")
+async def get_violation_email(violation_id: str):
+    data = await service.get_violation_email(violation_id)
+    if not data:
+        raise HTTPException(status_code=404, detail="Violation not found")
+    return data
 
 # 3. Get Full Profile (Charts + Score)
+# Served from profile_cache when possible; clients revalidate with If-None-Match
 @router.get("/user/{plate_no}/full_profile")
-def get_full_profile(plate_no: str):
-    data = service.get_full_profile(plate_no)
-    if not data:
-        raise HTTPException(status_code=404, detail="Vehicle not found. Please register first.")
-    return data
\ No newline at end of file
+async def get_full_profile(plate_no: str, request: Request):
+    entry = profile_cache.get(plate_no)
+    cache_status = "HIT"
+    if entry is None:
+        cache_status = "MISS"
+        profile_cache.begin(plate_no)
+        try:
+            data, valid_until = await service.load_profile(plate_no)
+        except Exception:
+            profile_cache.discard(plate_no)
+            raise
+        if not data:
+            profile_cache.discard(plate_no)
+            raise HTTPException(status_code=404, detail="Vehicle not found. Please register first.")
+        body = JSONResponse(jsonable_encoder(data)).body
+        entry = profile_cache.put(plate_no, body, valid_until)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache", "X-Cache": cache_status}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+# 3b. Profile Cache Counters
+@router.get("/profile_cache/stats")
+async def get_profile_cache_stats():
+    return profile_cache.stats()
\ No newline at end of file
@@ -0,0 +1,25 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException
+
+from app.services.revenue.revenue_service import RevenueService
+
+router = APIRouter()
+service = RevenueService()
+
+# 1. Revenue Totals for a Date Range (inclusive, read from the rollups)
+@router.get("/totals")
+async def get_revenue_totals(start: date, end: date):
+    try:
+        return await service.get_totals(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# 2. Daily / Monthly Settlement Rows
+@router.get("/rollups")
+async def get_revenue_rollups(start: date, end: date, period: Literal["day", "month"] = "day"):
+    try:
+        return await service.get_rollups(period, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,15 +1,81 @@
 # GoodRoad/backend/app/database.py
-from pymongo import MongoClient
+import os
 
-# 1. Connect to the MongoDB Server running on your machine
-client = MongoClient("mongodb://localhost:27017/")
+from pymongo import AsyncMongoClient
 
-# 2. Create (or connect to) a database named 'goodroad'
-db = client["goodroad"]
+from app.services.metrics.metrics import mongo_command_metrics
 
-# 3. Define our collections (like tables in SQL)
-drivers_collection = db["drivers"]
-violations_collection = db["violations"]
-rewards_collection = db["rewards"]  # For dashcam footage submissions
+# 1. Connection settings (nothing connects at import time)
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "goodroad")
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", "20000"))
 
-print("Connected to MongoDB successfully!")
\ No newline at end of file
+# 2. Our collections (like tables in SQL)
+#   drivers          - registered vehicles
+#   violations       - penalty events
+#   rewards          - dashcam footage submissions
+#   violation_events - every ViolationEvent received (dedup by eventId and time window)
+#   driver_summaries - pre-aggregated profile stats per plate
+#   repeat_counters  - per-plate, per-type violation counts
+#   sweeper_state    - expiry sweeper progress and lease
+#   risk_transitions - risk level changes caused by expiring points
+#   revenue_ledger   - penalty split of every charged violation
+#   revenue_rollups  - per-day and per-month revenue totals
+#   rule_sets        - versioned scoring rules (weights, expiry days, multipliers)
+#   rescore_jobs     - checkpoints and reports of re-scoring runs
+
+_async_client = None
+
+
+def _client_options():
+    return {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        # Per-command counts and round trips for /api/metrics
+        "event_listeners": [mongo_command_metrics],
+    }
+
+
+# --- A. CLIENT (FastAPI routes, background tasks and the app.scripts commands) ---
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncMongoClient(MONGO_URI, **_client_options())
+    return _async_client
+
+
+def get_async_db():
+    return get_async_client()[MONGO_DB_NAME]
+
+
+class _Collections:
+    """Attribute access to the collections of a lazily created database, e.g. async_db.violations."""
+
+    def __init__(self, get_database):
+        self._get_database = get_database
+
+    def __getattr__(self, name):
+        return self._get_database()[name]
+
+
+async_db = _Collections(get_async_db)
+
+
+# --- B. LIFECYCLE (called from the FastAPI lifespan) ---
+async def connect():
+    await get_async_db().command("ping")
+    print("Connected to MongoDB successfully!")
+
+
+async def close():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
@@ -0,0 +1,93 @@
+# GoodRoad/backend/app/indexes.py
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.database import async_db
+
+# Every hot query should be served by one of these. create_indexes() is a no-op
+# for indexes that already exist, so this is safe to run on every startup.
+INDEXES = {
+    "drivers": [
+        IndexModel([("plate_no", ASCENDING)], unique=True, name="plate_no_unique"),
+    ],
+    "violations": [
+        # Repeat counts / per-type lookups, and the re-scoring scan in (plate, type, time) order
+        IndexModel(
+            [("plate_no", ASCENDING), ("type", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+            name="plate_no_type_timestamp_id"
+        ),
+        # Profile history and keyset pagination on (timestamp, _id)
+        IndexModel([("plate_no", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)], name="plate_no_timestamp_id"),
+        # Active/expired split for the current day
+        IndexModel([("plate_no", ASCENDING), ("expiry_date", ASCENDING)], name="plate_no_expiry_date"),
+        # Expiry sweeper: everything that expired since its last run
+        IndexModel([("expiry_date", ASCENDING)], name="expiry_date"),
+        # Fleet analytics: per-type counts over a time range (covered query)
+        IndexModel([("timestamp", ASCENDING), ("type", ASCENDING)], name="timestamp_type"),
+        # Email outbox: only pending records are indexed
+        IndexModel(
+            [("email_status", ASCENDING), ("timestamp", ASCENDING)],
+            name="email_outbox",
+            partialFilterExpression={"email_status": "pending"}
+        ),
+    ],
+    "rewards": [
+        # Rewards carry the reported violation type in `violation_reported`
+        IndexModel([("plate_no", ASCENDING), ("violation_reported", ASCENDING)], name="plate_no_type"),
+        IndexModel([("plate_no", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)], name="plate_no_timestamp_id"),
+    ],
+    "driver_summaries": [
+        IndexModel([("plate_no", ASCENDING)], unique=True, name="plate_no_unique"),
+        # Fleet analytics: top-N and per-level counts on the swept active points
+        IndexModel([("active_points", DESCENDING), ("plate_no", ASCENDING)], name="active_points"),
+    ],
+    "repeat_counters": [
+        IndexModel([("plate_no", ASCENDING), ("type", ASCENDING)], unique=True, name="plate_no_type_unique"),
+    ],
+    "risk_transitions": [
+        IndexModel([("plate_no", ASCENDING), ("at", ASCENDING)], name="plate_no_at"),
+    ],
+    "rule_sets": [
+        IndexModel([("version", ASCENDING)], unique=True, name="version_unique"),
+    ],
+    "violation_events": [
+        # Dashcam retries: one record per eventId
+        IndexModel([("event_id", ASCENDING)], unique=True, name="event_id_unique"),
+        # Near-duplicate check: same plate and type around the same event_time
+        IndexModel([("plate_no", ASCENDING), ("type", ASCENDING), ("event_time", ASCENDING)], name="plate_no_type_event_time"),
+    ],
+    "revenue_ledger": [
+        # Reconciliation and backfill scan the ledger by time (_id is the violation's _id)
+        IndexModel([("timestamp", ASCENDING)], name="timestamp"),
+    ],
+    "revenue_rollups": [
+        IndexModel([("period", ASCENDING), ("key", ASCENDING)], unique=True, name="period_key_unique"),
+    ],
+}
+
+
+# Server error code of drop_index() on a missing index
+INDEX_NOT_FOUND = 27
+
+# Older indexes that a wider one above now covers (dropped if still present)
+SUPERSEDED_INDEXES = {
+    "violations": ["plate_no_timestamp", "plate_no_type"],
+    "rewards": ["plate_no_timestamp"],
+}
+
+
+async def ensure_indexes():
+    for name, indexes in INDEXES.items():
+        await getattr(async_db, name).create_indexes(indexes)
+    for name, index_names in SUPERSEDED_INDEXES.items():
+        collection = getattr(async_db, name)
+        existing = await collection.index_information()
+        for index_name in index_names:
+            if index_name in existing:
+                try:
+                    await collection.drop_index(index_name)
+                except OperationFailure as e:
+                    # Another app instance starting at the same time dropped it first
+                    if e.code != INDEX_NOT_FOUND:
+                        raise
+    print("MongoDB indexes are up to date")
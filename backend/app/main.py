@@ -1,9 +1,39 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.routes.analytics_routes import router as analytics_router
 from app.api.routes.penalty_routes import router as penalty_router
+from app.api.routes.history_routes import router as history_router
+from app.api.routes.metrics_routes import router as metrics_router
+from app.api.routes.revenue_routes import router as revenue_router
+from app.repositories.provider import get_repository
+from app.services.ai.email_worker import email_worker_pool
+from app.services.expiry.expiry_sweeper import expiry_sweeper
+from app.services.metrics.metrics import http_latency, http_requests, route_template
+from app.services.metrics.sampling_profiler import SAMPLING_PROFILER, sampling_profiler
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Opt-in: samples the event loop thread for hot spots (see sampling_profiler.py)
+    if SAMPLING_PROFILER:
+        sampling_profiler.start()
+    # Storage is created lazily; connect (and ensure indexes) here, not at import
+    repository = get_repository()
+    await repository.connect()
+    # Background pool that fills in AI emails for pending violations
+    email_worker_pool.start()
+    # Moves expired points out of each driver's active total
+    expiry_sweeper.start()
+    yield
+    await expiry_sweeper.stop()
+    await email_worker_pool.stop()
+    await repository.close()
+    sampling_profiler.stop()
 
-app = FastAPI(title="GoodRoad API")
+app = FastAPI(title="GoodRoad API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,9 +41,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Per-route request counts and latency, labelled with the route template.
+# Streaming responses are timed until their first byte.
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = route_template(request.scope)
+        http_latency.observe(time.perf_counter() - start, method=request.method, route=route)
+        http_requests.inc(method=request.method, route=route, status=str(status))
+
 app.include_router(penalty_router, prefix="/api/penalty")
+app.include_router(history_router, prefix="/api/penalty")
+app.include_router(revenue_router, prefix="/api/revenue")
+app.include_router(analytics_router, prefix="/api/analytics")
+app.include_router(metrics_router, prefix="/api/metrics")
 
 @app.get("/api/health")
 def health():
@@ -0,0 +1,77 @@
+# GoodRoad/backend/app/models/records.py
+# Status values, levels and ledger documents shared by the services and both
+# storage backends. Nothing in here touches storage.
+
+# --- A. STATUSES ---
+# email_status of a violation (see email_worker.py)
+EMAIL_PENDING = "pending"
+EMAIL_DONE = "done"          # Generated by Gemini
+EMAIL_FALLBACK = "fallback"  # Gemini failed, template used
+EMAIL_FAILED = "failed"      # Gave up (no driver / attempts exhausted)
+
+# status of a dashcam event (see ingestion_service.py)
+EVENT_RECEIVED = "received"
+EVENT_ACCEPTED = "accepted"
+EVENT_NEAR_DUPLICATE = "near_duplicate"
+# Events that hold their (plate, type, time window) against later submissions
+CLAIMING_STATUSES = (EVENT_RECEIVED, EVENT_ACCEPTED)
+
+
+# --- B. LEVELS ---
+# Highest level first: more than 30 active points is Critical, and so on
+RISK_THRESHOLDS = [(30, "Critical"), (20, "High"), (10, "Moderate")]
+
+
+def risk_level(active_points):
+    for threshold, level in RISK_THRESHOLDS:
+        if active_points > threshold:
+            return level
+    return "Low"
+
+
+# Highest level first: 30 or more accepted dashcam uploads is Platinum, and so on
+CONTRIBUTOR_LEVELS = [(30, "Platinum"), (15, "Gold"), (5, "Silver")]
+
+
+def contributor_level(contributions):
+    for threshold, level in CONTRIBUTOR_LEVELS:
+        if contributions >= threshold:
+            return level
+    return "Bronze"
+
+
+# --- C. REVENUE LEDGER ---
+# revenue_ledger  - one entry per charged violation (_id = the violation's _id), with
+#                   the penalty split exactly as it was returned to the caller
+# revenue_rollups - one document per (period, key), period "day" ("2026-10-17") or
+#                   "month" ("2026-10"), holding $inc'ed totals for every stream
+STREAMS = ("government", "reward", "system", "total")
+ROLLUP_FIELDS = ("violations", "points") + STREAMS
+PERIOD_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+
+
+def ledger_entry(violation, split):
+    return {
+        "_id": violation["_id"],
+        "plate_no": violation["plate_no"],
+        "type": violation["type"],
+        "points": violation["points"],
+        "timestamp": violation["timestamp"],
+        **{stream: split[stream] for stream in STREAMS},
+    }
+
+
+def empty_rollup():
+    return {field: 0 for field in ROLLUP_FIELDS}
+
+
+def rollup_increments(entries):
+    """{(period, key): {field: amount}} for a batch of ledger entries."""
+    increments = {}
+    for e in entries:
+        for period, fmt in PERIOD_FORMATS.items():
+            inc = increments.setdefault((period, e["timestamp"].strftime(fmt)), empty_rollup())
+            inc["violations"] += 1
+            for field in ROLLUP_FIELDS[1:]:
+                inc[field] += e[field]
+    return increments
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 class ViolationEvent(BaseModel):
@@ -5,3 +7,5 @@ class ViolationEvent(BaseModel):
     plateNo: str
     violationType: str
     eventTime: str
+    # Registered plate of the dashcam owner who uploaded the footage (earns the reward)
+    reporterPlateNo: Optional[str] = None
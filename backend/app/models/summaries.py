@@ -0,0 +1,172 @@
+# GoodRoad/backend/app/models/summaries.py
+from datetime import datetime, timedelta
+
+# A summary document holds everything get_full_profile needs, so a profile read
+# costs the same for a plate with 5 records as for one with 50,000:
+#   total_violations, penalty_timeline{month}, violation_types{label},
+#   expiry_buckets{day: points}, recent_violation_ids[-5:] (latest recorded, by _id),
+#   active_points / expired_points (moved by the expiry sweeper, see expiry_sweeper.py),
+#   points_swept_until (end of the last sweep window moved into this summary),
+#   total_rewards, total_contributions, reward_timeline{month},
+#   reward_types{type}, recent_reward_ids[-5:]
+# The update builders below return MongoDB update documents; fold_update applies
+# the same update to a plain dict, so both storage backends share them.
+RECENT_LIMIT = 5
+
+
+def _field(key):
+    # Mongo field names may not contain '.' or start with '$'
+    return str(key).replace(".", "_").replace("$", "_")
+
+
+def _month(dt):
+    return dt.strftime("%Y-%m")
+
+
+def _day(dt):
+    return dt.strftime("%Y-%m-%d")
+
+
+# --- A. INCREMENTAL UPDATES ---
+def violations_update(violations):
+    """Builds one atomic $inc/$push update for new violations of the same plate."""
+    inc = {"total_violations": len(violations), "active_points": 0}
+    for v in violations:
+        inc["active_points"] += v["points"]
+        for path, amount in (
+            (f"penalty_timeline.{_month(v['timestamp'])}", 1),
+            (f"violation_types.{_field(v['label'])}", 1),
+            (f"expiry_buckets.{_day(v['expiry_date'])}", v["points"]),
+        ):
+            inc[path] = inc.get(path, 0) + amount
+    return {
+        "$inc": inc,
+        "$push": {"recent_violation_ids": {"$each": [v["_id"] for v in violations], "$sort": 1, "$slice": -RECENT_LIMIT}},
+        "$set": {"updated_at": datetime.now()}
+    }
+
+
+def rewards_update(rewards):
+    """Builds one atomic $inc/$push update for new rewards of the same plate."""
+    inc = {"total_contributions": len(rewards), "total_rewards": 0}
+    for r in rewards:
+        inc["total_rewards"] += r.get("amount", 0)
+        for path in (
+            f"reward_timeline.{_month(r['timestamp'])}",
+            f"reward_types.{_field(r.get('violation_reported', 'Other'))}",
+        ):
+            inc[path] = inc.get(path, 0) + 1
+    return {
+        "$inc": inc,
+        "$push": {"recent_reward_ids": {"$each": [r["_id"] for r in rewards], "$sort": 1, "$slice": -RECENT_LIMIT}},
+        "$set": {"updated_at": datetime.now()}
+    }
+
+
+def fold_update(summary, update):
+    """Applies an update built above to an in-memory summary (same semantics as Mongo)."""
+    for path, amount in update["$inc"].items():
+        parts = path.split(".")
+        target = summary
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = target.get(parts[-1], 0) + amount
+    for field, push in update["$push"].items():
+        items = summary.get(field, []) + push["$each"]
+        if push.get("$sort"):
+            items.sort()
+        summary[field] = items[push["$slice"]:]
+
+
+# --- B. ACTIVE / EXPIRED POINTS ---
+def expiry_day_range(now):
+    """The [start, end) range of the one expiry bucket that can straddle `now`."""
+    start = datetime(now.year, now.month, now.day)
+    return start, start + timedelta(days=1)
+
+
+def split_points(summary, now, boundary_violations=()):
+    """
+    Active vs. expired points from the per-day expiry buckets. Only the bucket for
+    today straddles `now`; `boundary_violations` are the raw records expiring today
+    (see expiry_day_range) so that one day is resolved exactly.
+    """
+    today = _day(now)
+    active = expired = 0
+    for day, points in summary.get("expiry_buckets", {}).items():
+        if day > today:
+            active += points
+        elif day < today:
+            expired += points
+
+    for v in boundary_violations:
+        if v["expiry_date"] > now:
+            active += v["points"]
+        else:
+            expired += v["points"]
+    return active, expired
+
+
+def points_swept_until(watermark, swept_until):
+    """
+    How far a summary's expired points have been moved: the sweeper's swept_until,
+    or the summary's own points_swept_until if a sweep run that did not complete
+    got further. Windows a summary had nothing in never advance its watermark.
+    """
+    if watermark is None or watermark <= swept_until:
+        return swept_until
+    return watermark
+
+
+def boundary_range(summary, now):
+    """Range to pass to split_points' boundary lookup, or None if nothing expires today."""
+    if _day(now) not in summary.get("expiry_buckets", {}):
+        return None
+    return expiry_day_range(now)
+
+
+def next_expiry(summary, now, boundary_violations=()):
+    """
+    Earliest moment after `now` at which split_points' result changes, or None if no
+    active points are left. Used to expire cached profiles right on time.
+    """
+    upcoming = [v["expiry_date"] for v in boundary_violations if v["expiry_date"] > now]
+    if upcoming:
+        return min(upcoming)
+    today = _day(now)
+    later = [day for day, points in summary.get("expiry_buckets", {}).items() if day > today and points]
+    if later:
+        # Nothing in that bucket can expire before the start of its day
+        return datetime.strptime(min(later), "%Y-%m-%d")
+    return None
+
+
+# --- C. REBUILD ---
+def empty_summary(plate_no):
+    return {
+        "plate_no": plate_no,
+        "total_violations": 0, "penalty_timeline": {}, "violation_types": {},
+        "expiry_buckets": {}, "recent_violation_ids": [],
+        "active_points": 0, "expired_points": 0,
+        "total_rewards": 0, "total_contributions": 0, "reward_timeline": {},
+        "reward_types": {}, "recent_reward_ids": [],
+    }
+
+
+def build_summary(plate_no, violations, rewards, swept_until):
+    """
+    Recomputes a summary from a plate's raw violations and rewards, each in
+    (timestamp, _id) order. Points count as expired once the sweeper has passed
+    them (expiry_date < swept_until, see points_swept_until), same as the stored state.
+    """
+    summary = empty_summary(plate_no)
+    for v in violations:
+        fold_update(summary, violations_update([v]))
+        if v["expiry_date"] < swept_until:
+            summary["active_points"] -= v["points"]
+            summary["expired_points"] += v["points"]
+    for r in rewards:
+        fold_update(summary, rewards_update([r]))
+    summary["points_swept_until"] = swept_until
+    summary["updated_at"] = datetime.now()
+    return summary
@@ -0,0 +1,309 @@
+# GoodRoad/backend/app/repositories/base.py
+from abc import ABC, abstractmethod
+
+
+class DuplicateRecordError(Exception):
+    """Raised when an insert collides with a unique key (e.g. an already registered plate)."""
+
+
+class PenaltyRepository(ABC):
+    """
+    Storage operations used by the services, background workers and scripts, which
+    never talk to a database themselves. Records are plain dicts with an ObjectId
+    `_id`, exactly as they are stored in MongoDB, so the scoring logic does not care
+    which backend it runs on. A backend missing any method fails when constructed.
+    """
+
+    # --- A. DRIVERS ---
+    @abstractmethod
+    async def find_driver(self, plate_no):
+        ...
+
+    @abstractmethod
+    async def find_drivers(self, plate_nos):
+        """Returns {plate_no: driver} for the plates that are registered."""
+
+    @abstractmethod
+    async def insert_driver(self, driver):
+        """Stores the driver, sets driver["_id"] and returns it. Raises DuplicateRecordError."""
+
+    @abstractmethod
+    async def add_contributor_upload(self, plate_no):
+        """
+        Counts one more accepted upload and sets the matching contributor_level in the
+        same write; returns {upload_count, contributor_level}, or None if not registered.
+        """
+
+    # --- B. VIOLATIONS ---
+    @abstractmethod
+    async def reserve_repeat_count(self, plate_no, violation_code):
+        """Atomically counts one more violation of this type and returns the new total."""
+
+    @abstractmethod
+    async def reserve_repeat_counts(self, amounts):
+        """{(plate_no, type): n} -> {(plate_no, type): new total}."""
+
+    @abstractmethod
+    async def release_repeat_counts(self, amounts):
+        ...
+
+    @abstractmethod
+    async def rebuild_repeat_counts(self, plate_no=None):
+        """Recomputes the counts (of one plate, or all) from the stored violations; returns how many."""
+
+    @abstractmethod
+    async def insert_violation(self, violation):
+        """Stores the violation, sets violation["_id"] and returns it."""
+
+    @abstractmethod
+    async def insert_violations(self, violations):
+        """Unordered bulk insert; sets each `_id` and returns [(index, error message)] for failures."""
+
+    @abstractmethod
+    async def find_violation(self, violation_id, fields=None):
+        ...
+
+    @abstractmethod
+    async def find_violations_by_ids(self, ids):
+        """Returns the records in the order of `ids`, skipping missing ones."""
+
+    @abstractmethod
+    async def find_violations_expiring_between(self, plate_no, start, end):
+        ...
+
+    @abstractmethod
+    async def find_violations_page(self, plate_no, before, limit, fields):
+        """
+        Newest-first page of a plate's violations, keyset-paginated on (timestamp, _id).
+        `before` is None or a (timestamp, _id) pair from the last record of the previous page.
+        """
+
+    @abstractmethod
+    async def iter_records(self, kind, plate_no=None, start=None, end=None, record_type=None):
+        """
+        Async iterator over "violations" or "rewards" matching the filters (timestamp in
+        [start, end)), read from a server-side cursor so memory stays flat.
+        """
+
+    # --- C. REWARDS ---
+    @abstractmethod
+    async def find_rewards_by_ids(self, ids):
+        ...
+
+    @abstractmethod
+    async def insert_reward(self, reward):
+        """Stores the reward, sets reward["_id"] and returns it."""
+
+    # --- D. DRIVER SUMMARIES ---
+    @abstractmethod
+    async def apply_violations_to_summaries(self, violations):
+        """
+        Folds newly inserted violations into their plates' summaries. A plate without
+        one (history from before summaries existed) first gets one built from its
+        raw records, minus these violations.
+        """
+
+    @abstractmethod
+    async def apply_reward_to_summary(self, reward):
+        """Folds a newly inserted reward into its plate's summary, building a missing one as above."""
+
+    @abstractmethod
+    async def create_summary(self, plate_no):
+        """Stores an empty summary for a newly registered plate unless one exists already."""
+
+    @abstractmethod
+    async def get_summary(self, plate_no):
+        """
+        Returns the summary, building it from the raw records if missing. The rebuilt
+        summary is only stored if none was created meanwhile, never over one.
+        """
+
+    @abstractmethod
+    async def find_stored_summary(self, plate_no):
+        """The stored summary as it is, or None."""
+
+    @abstractmethod
+    async def compute_summary(self, plate_no, exclude_ids=()):
+        """
+        A summary recomputed from the raw records (see summaries.build_summary), leaving
+        out the records in `exclude_ids`; nothing is written.
+        """
+
+    @abstractmethod
+    async def replace_summary(self, summary):
+        """Overwrites the stored summary of summary["plate_no"] and returns it as stored."""
+
+    @abstractmethod
+    async def list_summary_plates(self):
+        """Sorted plates that have violations, rewards or a stored summary."""
+
+    # --- E. EMAIL OUTBOX ---
+    @abstractmethod
+    async def claim_email_job(self, now, lease_until):
+        """Leases the oldest pending email job whose lease is free or expired (see email_worker.py)."""
+
+    @abstractmethod
+    async def complete_email_job(self, job, status, text, completed_at):
+        ...
+
+    # --- F. REVENUE LEDGER ---
+    @abstractmethod
+    async def record_revenue(self, entries):
+        """
+        Stores ledger entries (see records.ledger_entry) and adds them to the
+        day/month rollups. Entries whose _id is already in the ledger are ignored,
+        so if the rollup write fails after the ledger write, retrying does not add
+        them: run `python -m app.scripts.reconcile_revenue --fix` to rebuild the
+        rollups from the ledger.
+        """
+
+    @abstractmethod
+    async def find_revenue_rollups(self, period, keys):
+        """Rollup documents of `period` ("day"/"month") for the given keys; missing keys are left out."""
+
+    @abstractmethod
+    async def find_revenue_rollups_from(self, period, first_key=None):
+        """Every rollup document of `period` with key >= first_key (all of them when None)."""
+
+    @abstractmethod
+    async def revenue_ledger_totals(self, period, since=None):
+        """{key: rollup fields} of `period` recomputed from ledger entries with timestamp >= since."""
+
+    @abstractmethod
+    async def replace_revenue_rollup(self, period, key, totals):
+        ...
+
+    @abstractmethod
+    async def iter_violations_without_ledger(self, since=None, batch_size=1000):
+        """Async iterator over batches of violations (timestamp >= since) that have no ledger entry."""
+
+    # --- G. FLEET ANALYTICS ---
+    @abstractmethod
+    async def fleet_risk(self, limit):
+        """
+        {"top": [{plate_no, active_points, name, vehicle_type}] (highest first, at most `limit`),
+         "distribution": {risk level: summaries above Low}, "drivers": registered drivers},
+        based on the active_points kept by the expiry sweeper.
+        """
+
+    @abstractmethod
+    async def count_violation_types(self, start, end):
+        """{type: count} for violations with timestamp in [start, end)."""
+
+    # --- H. EXPIRY SWEEP ---
+    @abstractmethod
+    async def claim_expiry_sweep(self, now, lease_until):
+        """Leases the sweeper state ({swept_until, lease_until}); None if another sweeper holds it."""
+
+    @abstractmethod
+    async def complete_expiry_sweep(self, state, swept_until, now):
+        ...
+
+    @abstractmethod
+    async def expired_points_by_plate(self, start, end):
+        """{plate_no: points} of violations with expiry_date in [start, end)."""
+
+    @abstractmethod
+    async def move_expired_points(self, moved, since, now):
+        """
+        Moves `moved` ({plate_no: points expiring in [since, now)}) from active to expired
+        and sets each summary's points_swept_until to `now` in the same write. Safe to
+        repeat: a summary a failed run already advanced past `since` only gets what
+        expires in [its watermark, now), one at `now` is left alone (see
+        summaries.points_swept_until). Returns {plate_no: (points moved, active_points
+        after)} for the summaries updated.
+        """
+
+    @abstractmethod
+    async def record_risk_transitions(self, transitions):
+        ...
+
+    @abstractmethod
+    async def initialize_active_points(self, now):
+        """Sets active/expired points of every summary as of `now`; returns how many."""
+
+    # --- I. RULE SETS ---
+    @abstractmethod
+    async def find_rule_set(self, version=None):
+        """
+        Stored rule set document of `version`, or when None the active one (the most
+        recently activated, should two be active mid-activation; see rule_sets.py).
+        """
+
+    @abstractmethod
+    async def list_rule_sets(self):
+        """Stored rule sets by version, without their rules."""
+
+    @abstractmethod
+    async def ensure_rule_set(self, doc):
+        """Stores the document unless its version is stored already."""
+
+    @abstractmethod
+    async def latest_rule_set_version(self):
+        """Highest stored version, or None."""
+
+    @abstractmethod
+    async def insert_rule_set(self, doc):
+        """Raises DuplicateRecordError if the version is taken."""
+
+    @abstractmethod
+    async def activate_rule_set(self, version, now):
+        """
+        Makes `version` the only active rule set, activating it before deactivating the
+        others so there is always an active version; False if it is not stored.
+        """
+
+    # --- J. DASHCAM EVENTS ---
+    @abstractmethod
+    async def insert_violation_event(self, event):
+        """Stores the event, sets event["_id"] and returns it. Raises DuplicateRecordError on a known event_id."""
+
+    @abstractmethod
+    async def find_violation_event(self, event_id):
+        ...
+
+    @abstractmethod
+    async def find_claiming_events(self, plate_no, violation_type, start, end):
+        """
+        Received or accepted events of this plate and type with event_time in
+        [start, end], as {_id, event_id, status} (see records.CLAIMING_STATUSES).
+        """
+
+    @abstractmethod
+    async def update_violation_event(self, event, fields):
+        ...
+
+    @abstractmethod
+    async def delete_violation_event(self, event):
+        ...
+
+    # --- K. RE-SCORING ---
+    @abstractmethod
+    async def find_rescore_job(self, job_id):
+        """Checkpoint of a re-scoring job (see rescoring.py), or None."""
+
+    @abstractmethod
+    async def save_rescore_job(self, job_id, fields):
+        """Sets `fields` on the job's checkpoint, creating it if needed."""
+
+    @abstractmethod
+    async def delete_rescore_job(self, job_id):
+        ...
+
+    @abstractmethod
+    async def iter_violations_for_rescoring(self, after_plate, fields):
+        """
+        Async iterator over the violations of plates after `after_plate` (all when None),
+        in (plate_no, type, timestamp, _id) order, with `fields` ({name: 1}) and _id.
+        """
+
+    @abstractmethod
+    async def update_violation_scores(self, updates):
+        """Sets new fields on violations: [(_id, {field: value})]."""
+
+    # --- L. LIFECYCLE ---
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
@@ -0,0 +1,443 @@
+# GoodRoad/backend/app/repositories/memory_repository.py
+import bisect
+import copy
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+from app.models import summaries
+from app.models.records import CLAIMING_STATUSES, EMAIL_PENDING, contributor_level, risk_level, rollup_increments
+from app.repositories.base import DuplicateRecordError, PenaltyRepository
+
+
+class InMemoryRepository(PenaltyRepository):
+    """
+    Dict-backed storage with the same indexes as MongoDB (by plate, by plate+type,
+    by plate+expiry day, by expiry day). Used for load tests, profiling and CI
+    without MongoDB. Every method runs without awaiting, so each call is atomic
+    on the event loop.
+    """
+
+    def __init__(self):
+        self.drivers = {}              # plate_no -> driver
+        self.violations = {}           # _id -> violation
+        self.rewards = {}              # _id -> reward
+        self.summaries = {}            # plate_no -> summary
+        self.repeat_counts = {}        # (plate_no, type) -> count
+        self.by_plate_expiry_day = {}  # (plate_no, date) -> [_id]
+        self.by_plate_timestamp = {}   # plate_no -> sorted [(timestamp, _id)]
+        self.by_expiry_day = {}        # date -> [_id]
+        self.email_outbox = {}         # _id -> None, insertion order
+        self.revenue_ledger = {}       # violation _id -> ledger entry
+        self.revenue_rollups = {}      # (period, key) -> rollup
+        self.sweeper_state = {}        # swept_until / lease_until
+        self.risk_transitions = []
+        self.rule_sets = {}            # version -> rule set document (with "active")
+        self.rescore_jobs = {}         # job_id -> checkpoint
+        self.violation_events = {}     # event_id -> dashcam event
+        self.events_by_plate_type = {} # (plate_no, type) -> [event_id]
+
+    # --- A. DRIVERS ---
+    async def find_driver(self, plate_no):
+        driver = self.drivers.get(plate_no)
+        return dict(driver) if driver else None
+
+    async def find_drivers(self, plate_nos):
+        return {p: dict(self.drivers[p]) for p in plate_nos if p in self.drivers}
+
+    async def insert_driver(self, driver):
+        if driver["plate_no"] in self.drivers:
+            raise DuplicateRecordError(f"Duplicate plate_no: {driver['plate_no']}")
+        driver["_id"] = ObjectId()
+        self.drivers[driver["plate_no"]] = dict(driver)
+        return driver["_id"]
+
+    async def add_contributor_upload(self, plate_no):
+        driver = self.drivers.get(plate_no)
+        if driver is None:
+            return None
+        driver["upload_count"] = driver.get("upload_count", 0) + 1
+        driver["contributor_level"] = contributor_level(driver["upload_count"])
+        return {"upload_count": driver["upload_count"], "contributor_level": driver["contributor_level"]}
+
+    # --- B. VIOLATIONS ---
+    async def reserve_repeat_count(self, plate_no, violation_code):
+        return (await self.reserve_repeat_counts({(plate_no, violation_code): 1}))[(plate_no, violation_code)]
+
+    async def reserve_repeat_counts(self, amounts):
+        totals = {}
+        for key, n in amounts.items():
+            self.repeat_counts[key] = self.repeat_counts.get(key, 0) + n
+            totals[key] = self.repeat_counts[key]
+        return totals
+
+    async def release_repeat_counts(self, amounts):
+        for key, n in amounts.items():
+            self.repeat_counts[key] = self.repeat_counts.get(key, 0) - n
+
+    async def rebuild_repeat_counts(self, plate_no=None):
+        counts = {}
+        for v in self.violations.values():
+            if plate_no is None or v["plate_no"] == plate_no:
+                key = (v["plate_no"], v["type"])
+                counts[key] = counts.get(key, 0) + 1
+        self.repeat_counts.update(counts)
+        return len(counts)
+
+    async def insert_violation(self, violation):
+        violation["_id"] = ObjectId()
+        stored = dict(violation)
+        self.violations[stored["_id"]] = stored
+        self.by_plate_expiry_day.setdefault((stored["plate_no"], stored["expiry_date"].date()), []).append(stored["_id"])
+        bisect.insort(self.by_plate_timestamp.setdefault(stored["plate_no"], []), (stored["timestamp"], stored["_id"]))
+        self.by_expiry_day.setdefault(stored["expiry_date"].date(), []).append(stored["_id"])
+        if stored.get("email_status") == EMAIL_PENDING:
+            self.email_outbox[stored["_id"]] = None
+        return stored["_id"]
+
+    async def insert_violations(self, violations):
+        for v in violations:
+            await self.insert_violation(v)
+        return []
+
+    async def find_violation(self, violation_id, fields=None):
+        v = self.violations.get(ObjectId(violation_id))
+        if v is None:
+            return None
+        if fields is None:
+            return dict(v)
+        return {k: v[k] for k in ["_id", *fields] if k in v}
+
+    async def find_violations_by_ids(self, ids):
+        return [dict(self.violations[i]) for i in ids if i in self.violations]
+
+    async def find_violations_expiring_between(self, plate_no, start, end):
+        found = []
+        day, last = start.date(), (end - timedelta(microseconds=1)).date()
+        while day <= last:
+            for i in self.by_plate_expiry_day.get((plate_no, day), []):
+                v = self.violations[i]
+                if start <= v["expiry_date"] < end:
+                    found.append({"_id": i, "points": v["points"], "expiry_date": v["expiry_date"]})
+            day += timedelta(days=1)
+        return found
+
+    async def find_violations_page(self, plate_no, before, limit, fields):
+        keys = self.by_plate_timestamp.get(plate_no, [])
+        end = bisect.bisect_left(keys, tuple(before)) if before else len(keys)
+        page = []
+        for _, i in reversed(keys[max(0, end - limit):end]):
+            v = self.violations[i]
+            page.append({k: v[k] for k in ["_id", *fields] if k in v})
+        return page
+
+    async def iter_records(self, kind, plate_no=None, start=None, end=None, record_type=None):
+        type_field = "type" if kind == "violations" else "violation_reported"
+        if kind == "violations" and plate_no:
+            records = [self.violations[i] for _, i in self.by_plate_timestamp.get(plate_no, [])]
+        else:
+            records = list(getattr(self, kind).values())
+        for doc in records:
+            if plate_no and doc["plate_no"] != plate_no:
+                continue
+            if (start and doc["timestamp"] < start) or (end and doc["timestamp"] >= end):
+                continue
+            if record_type and doc.get(type_field) != record_type:
+                continue
+            yield dict(doc)
+
+    # --- C. REWARDS ---
+    async def find_rewards_by_ids(self, ids):
+        return [dict(self.rewards[i]) for i in ids if i in self.rewards]
+
+    async def insert_reward(self, reward):
+        reward["_id"] = ObjectId()
+        self.rewards[reward["_id"]] = dict(reward)
+        return reward["_id"]
+
+    # --- D. DRIVER SUMMARIES ---
+    async def apply_violations_to_summaries(self, violations):
+        by_plate = {}
+        for v in violations:
+            by_plate.setdefault(v["plate_no"], []).append(v)
+        for plate_no, items in by_plate.items():
+            summary = await self._summary_for_update(plate_no, [v["_id"] for v in items])
+            summaries.fold_update(summary, summaries.violations_update(items))
+
+    async def apply_reward_to_summary(self, reward):
+        summary = await self._summary_for_update(reward["plate_no"], [reward["_id"]])
+        summaries.fold_update(summary, summaries.rewards_update([reward]))
+
+    async def _summary_for_update(self, plate_no, exclude_ids):
+        # Same as the Mongo backend: a missing summary is built from the older records first
+        if plate_no not in self.summaries:
+            self.summaries[plate_no] = await self.compute_summary(plate_no, exclude_ids)
+        return self.summaries[plate_no]
+
+    async def create_summary(self, plate_no):
+        self.summaries.setdefault(plate_no, summaries.empty_summary(plate_no))
+
+    async def get_summary(self, plate_no):
+        if plate_no not in self.summaries:
+            self.summaries[plate_no] = await self.compute_summary(plate_no)
+        return copy.deepcopy(self.summaries[plate_no])
+
+    async def find_stored_summary(self, plate_no):
+        summary = self.summaries.get(plate_no)
+        return copy.deepcopy(summary) if summary else None
+
+    async def compute_summary(self, plate_no, exclude_ids=()):
+        exclude = set(exclude_ids)
+        violations = [self.violations[i] for _, i in self.by_plate_timestamp.get(plate_no, []) if i not in exclude]
+        rewards = sorted(
+            (r for r in self.rewards.values() if r["plate_no"] == plate_no and r["_id"] not in exclude),
+            key=lambda r: (r["timestamp"], r["_id"])
+        )
+        swept_until = self.sweeper_state.get("swept_until") or datetime.now()
+        if self.sweeper_state.get("swept_until") and plate_no in self.summaries:
+            swept_until = summaries.points_swept_until(self.summaries[plate_no].get("points_swept_until"), swept_until)
+        return summaries.build_summary(plate_no, violations, rewards, swept_until)
+
+    async def replace_summary(self, summary):
+        self.summaries[summary["plate_no"]] = copy.deepcopy(summary)
+        return copy.deepcopy(summary)
+
+    async def list_summary_plates(self):
+        plates = set(self.by_plate_timestamp) | set(self.summaries)
+        plates.update(r["plate_no"] for r in self.rewards.values())
+        return sorted(plates)
+
+    # --- E. EMAIL OUTBOX ---
+    async def claim_email_job(self, now, lease_until):
+        for i in self.email_outbox:
+            v = self.violations[i]
+            if v.get("email_lease_until") is None or v["email_lease_until"] < now:
+                v["email_lease_until"] = lease_until
+                v["email_attempts"] = v.get("email_attempts", 0) + 1
+                return dict(v)
+        return None
+
+    async def complete_email_job(self, job, status, text, completed_at):
+        v = self.violations.get(job["_id"])
+        if not v or v.get("email_status") != EMAIL_PENDING or v.get("email_lease_until") != job["email_lease_until"]:
+            return
+        v.update({"email_status": status, "generated_email": text, "email_completed_at": completed_at})
+        v.pop("email_lease_until", None)
+        self.email_outbox.pop(job["_id"], None)
+
+    # --- F. REVENUE LEDGER ---
+    async def record_revenue(self, entries):
+        new_entries = [e for e in entries if e["_id"] not in self.revenue_ledger]
+        for e in new_entries:
+            self.revenue_ledger[e["_id"]] = dict(e)
+        for (period, key), inc in rollup_increments(new_entries).items():
+            rollup = self.revenue_rollups.setdefault((period, key), {"period": period, "key": key})
+            for field, amount in inc.items():
+                rollup[field] = rollup.get(field, 0) + amount
+
+    async def find_revenue_rollups(self, period, keys):
+        return [dict(self.revenue_rollups[(period, k)]) for k in keys if (period, k) in self.revenue_rollups]
+
+    async def find_revenue_rollups_from(self, period, first_key=None):
+        return [
+            dict(rollup) for (p, key), rollup in sorted(self.revenue_rollups.items())
+            if p == period and (first_key is None or key >= first_key)
+        ]
+
+    async def revenue_ledger_totals(self, period, since=None):
+        entries = [e for e in self.revenue_ledger.values() if since is None or e["timestamp"] >= since]
+        return {key: inc for (p, key), inc in rollup_increments(entries).items() if p == period}
+
+    async def replace_revenue_rollup(self, period, key, totals):
+        self.revenue_rollups[(period, key)] = {"period": period, "key": key, **totals}
+
+    async def iter_violations_without_ledger(self, since=None, batch_size=1000):
+        missing = [
+            dict(v) for i, v in self.violations.items()
+            if i not in self.revenue_ledger and (since is None or v["timestamp"] >= since)
+        ]
+        for start in range(0, len(missing), batch_size):
+            yield missing[start:start + batch_size]
+
+    # --- G. FLEET ANALYTICS ---
+    async def fleet_risk(self, limit):
+        scored = [(s.get("active_points", 0), plate_no) for plate_no, s in self.summaries.items()]
+        distribution = {}
+        for points, _ in scored:
+            level = risk_level(points)
+            if level != "Low":
+                distribution[level] = distribution.get(level, 0) + 1
+        top = sorted((item for item in scored if item[0] > 0), key=lambda item: (-item[0], item[1]))[:limit]
+        return {
+            "top": [
+                {
+                    "plate_no": plate_no, "active_points": points,
+                    "name": self.drivers.get(plate_no, {}).get("name"),
+                    "vehicle_type": self.drivers.get(plate_no, {}).get("vehicle_type"),
+                }
+                for points, plate_no in top
+            ],
+            "distribution": distribution,
+            "drivers": len(self.drivers),
+        }
+
+    async def count_violation_types(self, start, end):
+        counts = {}
+        for v in self.violations.values():
+            if start <= v["timestamp"] < end:
+                counts[v["type"]] = counts.get(v["type"], 0) + 1
+        return counts
+
+    # --- H. EXPIRY SWEEP ---
+    async def claim_expiry_sweep(self, now, lease_until):
+        lease = self.sweeper_state.get("lease_until")
+        if lease is not None and lease >= now:
+            return None
+        self.sweeper_state["lease_until"] = lease_until
+        return dict(self.sweeper_state)
+
+    async def complete_expiry_sweep(self, state, swept_until, now):
+        if self.sweeper_state.get("lease_until") != state["lease_until"]:
+            return
+        self.sweeper_state.update({"swept_until": swept_until, "last_run_at": now})
+        self.sweeper_state.pop("lease_until", None)
+
+    async def expired_points_by_plate(self, start, end):
+        moved = {}
+        day, last = start.date(), (end - timedelta(microseconds=1)).date()
+        while day <= last:
+            for i in self.by_expiry_day.get(day, []):
+                v = self.violations[i]
+                if start <= v["expiry_date"] < end:
+                    moved[v["plate_no"]] = moved.get(v["plate_no"], 0) + v["points"]
+            day += timedelta(days=1)
+        return moved
+
+    async def move_expired_points(self, moved, since, now):
+        applied = {}
+        for plate_no, points in moved.items():
+            summary = self.summaries.get(plate_no)
+            if summary is None:
+                continue
+            start = summaries.points_swept_until(summary.get("points_swept_until"), since)
+            if start >= now:
+                continue
+            if start != since:
+                # A run that did not complete already moved [since, start) into this summary
+                points = sum(v["points"] for v in await self.find_violations_expiring_between(plate_no, start, now))
+            summary["active_points"] = summary.get("active_points", 0) - points
+            summary["expired_points"] = summary.get("expired_points", 0) + points
+            summary["points_swept_until"] = now
+            applied[plate_no] = (points, summary["active_points"])
+        return applied
+
+    async def record_risk_transitions(self, transitions):
+        self.risk_transitions.extend(dict(t) for t in transitions)
+
+    async def initialize_active_points(self, now):
+        for plate_no, summary in self.summaries.items():
+            boundary = summaries.boundary_range(summary, now)
+            boundary_violations = await self.find_violations_expiring_between(plate_no, *boundary) if boundary else []
+            summary["active_points"], summary["expired_points"] = summaries.split_points(
+                summary, now, boundary_violations
+            )
+            summary["points_swept_until"] = now
+        return len(self.summaries)
+
+    # --- I. RULE SETS ---
+    async def find_rule_set(self, version=None):
+        if version is not None:
+            doc = self.rule_sets.get(version)
+        else:
+            active = [doc for doc in self.rule_sets.values() if doc.get("active")]
+            doc = max(active, key=lambda d: d.get("activated_at") or datetime.min, default=None)
+        return copy.deepcopy(doc) if doc else None
+
+    async def list_rule_sets(self):
+        return [
+            {k: v for k, v in doc.items() if k != "rules"}
+            for _, doc in sorted(copy.deepcopy(self.rule_sets).items())
+        ]
+
+    async def ensure_rule_set(self, doc):
+        self.rule_sets.setdefault(doc["version"], copy.deepcopy(doc))
+
+    async def latest_rule_set_version(self):
+        return max(self.rule_sets, default=None)
+
+    async def insert_rule_set(self, doc):
+        if doc["version"] in self.rule_sets:
+            raise DuplicateRecordError(f"Duplicate rule set version: {doc['version']}")
+        self.rule_sets[doc["version"]] = copy.deepcopy(doc)
+
+    async def activate_rule_set(self, version, now):
+        if version not in self.rule_sets:
+            return False
+        self.rule_sets[version].update({"active": True, "activated_at": now})
+        for doc in self.rule_sets.values():
+            if doc["version"] != version:
+                doc["active"] = False
+        return True
+
+    # --- J. DASHCAM EVENTS ---
+    async def insert_violation_event(self, event):
+        if event["event_id"] in self.violation_events:
+            raise DuplicateRecordError(f"Duplicate event_id: {event['event_id']}")
+        event["_id"] = ObjectId()
+        self.violation_events[event["event_id"]] = dict(event)
+        self.events_by_plate_type.setdefault((event["plate_no"], event["type"]), []).append(event["event_id"])
+        return event["_id"]
+
+    async def find_violation_event(self, event_id):
+        event = self.violation_events.get(event_id)
+        return dict(event) if event else None
+
+    async def find_claiming_events(self, plate_no, violation_type, start, end):
+        found = []
+        for event_id in self.events_by_plate_type.get((plate_no, violation_type), []):
+            e = self.violation_events[event_id]
+            if start <= e["event_time"] <= end and e["status"] in CLAIMING_STATUSES:
+                found.append({"_id": e["_id"], "event_id": event_id, "status": e["status"]})
+        return found
+
+    async def update_violation_event(self, event, fields):
+        stored = self.violation_events.get(event["event_id"])
+        if stored is not None and stored["_id"] == event["_id"]:
+            stored.update(fields)
+
+    async def delete_violation_event(self, event):
+        stored = self.violation_events.get(event["event_id"])
+        if stored is not None and stored["_id"] == event["_id"]:
+            del self.violation_events[event["event_id"]]
+            self.events_by_plate_type[(stored["plate_no"], stored["type"])].remove(event["event_id"])
+
+    # --- K. RE-SCORING ---
+    async def find_rescore_job(self, job_id):
+        job = self.rescore_jobs.get(job_id)
+        return copy.deepcopy(job) if job else None
+
+    async def save_rescore_job(self, job_id, fields):
+        self.rescore_jobs.setdefault(job_id, {"_id": job_id}).update(copy.deepcopy(fields))
+
+    async def delete_rescore_job(self, job_id):
+        self.rescore_jobs.pop(job_id, None)
+
+    async def iter_violations_for_rescoring(self, after_plate, fields):
+        selected = sorted(
+            (v for v in self.violations.values() if after_plate is None or v["plate_no"] > after_plate),
+            key=lambda v: (v["plate_no"], v["type"], v["timestamp"], v["_id"])
+        )
+        for v in selected:
+            yield {k: v[k] for k in ["_id", *fields] if k in v}
+
+    async def update_violation_scores(self, updates):
+        for i, fields in updates:
+            v = self.violations.get(i)
+            if v is None:
+                continue
+            if "expiry_date" in fields and fields["expiry_date"] != v["expiry_date"]:
+                self.by_plate_expiry_day[(v["plate_no"], v["expiry_date"].date())].remove(i)
+                self.by_expiry_day[v["expiry_date"].date()].remove(i)
+                self.by_plate_expiry_day.setdefault((v["plate_no"], fields["expiry_date"].date()), []).append(i)
+                self.by_expiry_day.setdefault(fields["expiry_date"].date(), []).append(i)
+            v.update(fields)
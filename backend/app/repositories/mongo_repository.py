@@ -0,0 +1,651 @@
+# GoodRoad/backend/app/repositories/mongo_repository.py
+import asyncio
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app import database
+from app.database import async_db
+from app.indexes import ensure_indexes
+from app.models import summaries
+from app.models.records import (
+    CLAIMING_STATUSES, CONTRIBUTOR_LEVELS, EMAIL_PENDING, PERIOD_FORMATS, RISK_THRESHOLDS, ROLLUP_FIELDS,
+    rollup_increments,
+)
+from app.repositories.base import DuplicateRecordError, PenaltyRepository
+
+
+# Documents per round trip when streaming exports from a server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# Re-scoring reads bigger batches: it keeps only a few columns per record
+RESCORE_READ_BATCH = 5000
+
+# Server error code of a unique index violation
+DUPLICATE_KEY = 11000
+
+# _id of the expiry sweeper's progress document in `sweeper_state`
+EXPIRY_SWEEP_STATE = "expiry"
+
+
+# --- PIPELINES ---
+def contributor_level_expr(field):
+    return {"$switch": {
+        "branches": [{"case": {"$gte": [field, threshold]}, "then": level} for threshold, level in CONTRIBUTOR_LEVELS],
+        "default": "Bronze"
+    }}
+
+
+# Risk is read from the active_points the expiry sweeper keeps on each summary,
+# through the (active_points, plate_no) index: top-N reads N summaries and the
+# distribution only groups the drivers above the lowest threshold.
+def risk_level_expr(field):
+    return {"$switch": {
+        "branches": [{"case": {"$gt": [field, threshold]}, "then": level} for threshold, level in RISK_THRESHOLDS],
+        "default": "Low"
+    }}
+
+
+def top_risk_pipeline(limit):
+    return [
+        {"$match": {"active_points": {"$gt": 0}}},
+        {"$sort": {"active_points": -1, "plate_no": 1}},
+        {"$limit": limit},
+        {"$lookup": {"from": "drivers", "localField": "plate_no", "foreignField": "plate_no", "as": "driver"}},
+        {"$project": {
+            "_id": 0, "plate_no": 1, "active_points": 1,
+            "name": {"$first": "$driver.name"}, "vehicle_type": {"$first": "$driver.vehicle_type"}
+        }},
+    ]
+
+
+def risk_distribution_pipeline():
+    lowest = RISK_THRESHOLDS[-1][0]
+    return [
+        {"$match": {"active_points": {"$gt": lowest}}},
+        {"$group": {"_id": risk_level_expr("$active_points"), "drivers": {"$sum": 1}}},
+    ]
+
+
+def violation_types_pipeline(start, end):
+    # Covered by the (timestamp, type) index
+    return [
+        {"$match": {"timestamp": {"$gte": start, "$lt": end}}},
+        {"$group": {"_id": "$type", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+
+
+def repeat_counts_pipeline(match):
+    return [
+        {"$match": match},
+        {"$group": {"_id": {"plate_no": "$plate_no", "type": "$type"}, "count": {"$sum": 1}}}
+    ]
+
+
+async def _fetch_by_ids(collection, ids):
+    """Loads records by id, keeping the order of `ids`."""
+    if not ids:
+        return []
+    docs = {d["_id"]: d async for d in collection.find({"_id": {"$in": ids}})}
+    return [docs[i] for i in ids if i in docs]
+
+
+class MongoRepository(PenaltyRepository):
+
+    # --- A. DRIVERS ---
+    async def find_driver(self, plate_no):
+        return await async_db.drivers.find_one({"plate_no": plate_no})
+
+    async def find_drivers(self, plate_nos):
+        return {
+            d["plate_no"]: d
+            async for d in async_db.drivers.find(
+                {"plate_no": {"$in": list(plate_nos)}},
+                {"plate_no": 1, "name": 1, "email": 1}
+            )
+        }
+
+    async def insert_driver(self, driver):
+        try:
+            result = await async_db.drivers.insert_one(driver)
+        except DuplicateKeyError as e:
+            raise DuplicateRecordError(str(e))
+        return result.inserted_id
+
+    async def add_contributor_upload(self, plate_no):
+        # One more upload and the level that goes with it, in a single atomic update
+        return await async_db.drivers.find_one_and_update(
+            {"plate_no": plate_no},
+            [
+                {"$set": {"upload_count": {"$add": [{"$ifNull": ["$upload_count", 0]}, 1]}}},
+                {"$set": {"contributor_level": contributor_level_expr("$upload_count")}},
+            ],
+            projection={"_id": 0, "upload_count": 1, "contributor_level": 1},
+            return_document=ReturnDocument.AFTER
+        )
+
+    # --- B. VIOLATIONS ---
+    # repeat_counters holds one document per (plate_no, type) with how many violations
+    # of that type the plate has. Reserving a count is a single atomic $inc, so two
+    # violations arriving at the same time can never be given the same multiplier.
+    async def _seed_repeat_count(self, plate_no, violation_code, count):
+        # $setOnInsert: only the first seeder wins; later ones are no-ops
+        try:
+            await async_db.repeat_counters.update_one(
+                {"plate_no": plate_no, "type": violation_code},
+                {"$setOnInsert": {"count": count}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # A concurrent request created it first
+
+    async def reserve_repeat_count(self, plate_no, violation_code):
+        key = {"plate_no": plate_no, "type": violation_code}
+        counter = await async_db.repeat_counters.find_one_and_update(
+            key, {"$inc": {"count": 1}}, return_document=ReturnDocument.AFTER
+        )
+        if counter is None:
+            # First violation of this type since counters were introduced: seed from history
+            await self._seed_repeat_count(plate_no, violation_code, await async_db.violations.count_documents(key))
+            counter = await async_db.repeat_counters.find_one_and_update(
+                key, {"$inc": {"count": 1}}, return_document=ReturnDocument.AFTER
+            )
+        return counter["count"]
+
+    async def reserve_repeat_counts(self, amounts):
+        # Missing counters are seeded with one aggregation and one unordered bulk_write,
+        # then every pair gets its own atomic $inc, all in flight at once
+        if not amounts:
+            return {}
+        plates = list({plate_no for plate_no, _ in amounts})
+        codes = list({code for _, code in amounts})
+        existing = {
+            (c["plate_no"], c["type"])
+            async for c in async_db.repeat_counters.find(
+                {"plate_no": {"$in": plates}, "type": {"$in": codes}}, {"plate_no": 1, "type": 1}
+            )
+        }
+        missing = [key for key in amounts if key not in existing]
+        if missing:
+            seeds = {key: 0 for key in missing}
+            pipeline = repeat_counts_pipeline(
+                {"plate_no": {"$in": list({p for p, _ in missing})}, "type": {"$in": list({c for _, c in missing})}}
+            )
+            async for row in await async_db.violations.aggregate(pipeline):
+                key = (row["_id"]["plate_no"], row["_id"]["type"])
+                if key in seeds:
+                    seeds[key] = row["count"]
+            await self._seed_repeat_counts(seeds)
+
+        async def reserve(plate_no, code, n):
+            counter = await async_db.repeat_counters.find_one_and_update(
+                {"plate_no": plate_no, "type": code}, {"$inc": {"count": n}}, return_document=ReturnDocument.AFTER
+            )
+            return (plate_no, code), counter["count"]
+
+        return dict(await asyncio.gather(*(reserve(plate_no, code, n) for (plate_no, code), n in amounts.items())))
+
+    async def _seed_repeat_counts(self, seeds):
+        # $setOnInsert: only the first seeder of each counter wins; later ones are no-ops
+        try:
+            await async_db.repeat_counters.bulk_write([
+                UpdateOne({"plate_no": plate_no, "type": code}, {"$setOnInsert": {"count": count}}, upsert=True)
+                for (plate_no, code), count in seeds.items()
+            ], ordered=False)
+        except BulkWriteError as bwe:
+            # Duplicate keys are counters a concurrent request created first
+            if any(err.get("code") != DUPLICATE_KEY for err in bwe.details.get("writeErrors", [])):
+                raise
+
+    async def release_repeat_counts(self, amounts):
+        if amounts:
+            await async_db.repeat_counters.bulk_write([
+                UpdateOne({"plate_no": plate_no, "type": code}, {"$inc": {"count": -n}})
+                for (plate_no, code), n in amounts.items()
+            ], ordered=False)
+
+    async def rebuild_repeat_counts(self, plate_no=None):
+        pipeline = repeat_counts_pipeline({"plate_no": plate_no} if plate_no else {})
+        requests = [
+            UpdateOne(
+                {"plate_no": row["_id"]["plate_no"], "type": row["_id"]["type"]},
+                {"$set": {"count": row["count"]}},
+                upsert=True
+            )
+            async for row in await async_db.violations.aggregate(pipeline)
+        ]
+        if requests:
+            await async_db.repeat_counters.bulk_write(requests, ordered=False)
+        return len(requests)
+
+    async def insert_violation(self, violation):
+        result = await async_db.violations.insert_one(violation)
+        return result.inserted_id
+
+    async def insert_violations(self, violations):
+        if not violations:
+            return []
+        try:
+            await async_db.violations.insert_many(violations, ordered=False)
+        except BulkWriteError as bwe:
+            return [(err["index"], err.get("errmsg", "Write failed")) for err in bwe.details.get("writeErrors", [])]
+        return []
+
+    async def find_violation(self, violation_id, fields=None):
+        return await async_db.violations.find_one({"_id": ObjectId(violation_id)}, fields)
+
+    async def find_violations_by_ids(self, ids):
+        return await _fetch_by_ids(async_db.violations, ids)
+
+    async def find_violations_expiring_between(self, plate_no, start, end):
+        return await async_db.violations.find(
+            {"plate_no": plate_no, "expiry_date": {"$gte": start, "$lt": end}},
+            {"points": 1, "expiry_date": 1}
+        ).to_list()
+
+    async def find_violations_page(self, plate_no, before, limit, fields):
+        query = {"plate_no": plate_no}
+        if before:
+            timestamp, last_id = before
+            query["$or"] = [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$lt": last_id}}
+            ]
+        # Served by the (plate_no, timestamp, _id) index, walked backwards
+        return await async_db.violations.find(query, fields).sort(
+            [("timestamp", -1), ("_id", -1)]
+        ).limit(limit).to_list()
+
+    async def iter_records(self, kind, plate_no=None, start=None, end=None, record_type=None):
+        query = {}
+        if plate_no:
+            query["plate_no"] = plate_no
+        if start or end:
+            query["timestamp"] = {k: v for k, v in (("$gte", start), ("$lt", end)) if v}
+        if record_type:
+            query["type" if kind == "violations" else "violation_reported"] = record_type
+        cursor = getattr(async_db, kind).find(query, batch_size=EXPORT_BATCH_SIZE)
+        if plate_no:
+            cursor = cursor.sort([("timestamp", 1), ("_id", 1)])
+        async with cursor:
+            async for doc in cursor:
+                yield doc
+
+    # --- C. REWARDS ---
+    async def find_rewards_by_ids(self, ids):
+        return await _fetch_by_ids(async_db.rewards, ids)
+
+    async def insert_reward(self, reward):
+        result = await async_db.rewards.insert_one(reward)
+        return result.inserted_id
+
+    # --- D. DRIVER SUMMARIES ---
+    async def apply_violations_to_summaries(self, violations):
+        by_plate = {}
+        for v in violations:
+            by_plate.setdefault(v["plate_no"], []).append(v)
+        if not by_plate:
+            return
+        # A batch is folded into its summaries with one bulk_write
+        result = await async_db.driver_summaries.bulk_write([
+            UpdateOne({"plate_no": plate_no}, summaries.violations_update(items))
+            for plate_no, items in by_plate.items()
+        ], ordered=False)
+        if result.matched_count == len(by_plate):
+            return
+        stored = set(await async_db.driver_summaries.distinct("plate_no", {"plate_no": {"$in": list(by_plate)}}))
+        for plate_no, items in by_plate.items():
+            if plate_no not in stored:
+                await self._insert_built_summary(plate_no, [v["_id"] for v in items])
+                await async_db.driver_summaries.update_one({"plate_no": plate_no}, summaries.violations_update(items))
+
+    async def apply_reward_to_summary(self, reward):
+        update = summaries.rewards_update([reward])
+        result = await async_db.driver_summaries.update_one({"plate_no": reward["plate_no"]}, update)
+        if not result.matched_count:
+            await self._insert_built_summary(reward["plate_no"], [reward["_id"]])
+            await async_db.driver_summaries.update_one({"plate_no": reward["plate_no"]}, update)
+
+    async def _insert_built_summary(self, plate_no, exclude_ids):
+        # Plates whose history predates summaries (registered before create_summary)
+        # get one built from the raw records before their first $inc, or the stored
+        # summary would only ever hold the records written after the upgrade
+        await self._insert_summary_if_absent(await self.compute_summary(plate_no, exclude_ids))
+
+    async def create_summary(self, plate_no):
+        await self._insert_summary_if_absent(summaries.empty_summary(plate_no))
+
+    async def get_summary(self, plate_no):
+        summary = await self.find_stored_summary(plate_no)
+        if summary is None:
+            await self._insert_summary_if_absent(await self.compute_summary(plate_no))
+            summary = await self.find_stored_summary(plate_no)
+        return summary
+
+    async def _insert_summary_if_absent(self, summary):
+        # $setOnInsert never overwrites: a summary created meanwhile (by a concurrent
+        # rebuild or registration) keeps the increments it already holds
+        try:
+            await async_db.driver_summaries.update_one(
+                {"plate_no": summary["plate_no"]}, {"$setOnInsert": summary}, upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # Lost the upsert race on the unique plate_no index; theirs stands
+
+    async def find_stored_summary(self, plate_no):
+        return await async_db.driver_summaries.find_one({"plate_no": plate_no})
+
+    async def compute_summary(self, plate_no, exclude_ids=()):
+        state = await async_db.sweeper_state.find_one({"_id": EXPIRY_SWEEP_STATE}) or {}
+        swept_until = state.get("swept_until") or datetime.now()
+        if state.get("swept_until"):
+            stored = await async_db.driver_summaries.find_one({"plate_no": plate_no}, {"points_swept_until": 1}) or {}
+            swept_until = summaries.points_swept_until(stored.get("points_swept_until"), swept_until)
+        query = {"plate_no": plate_no}
+        if exclude_ids:
+            query["_id"] = {"$nin": list(exclude_ids)}
+        violations = async_db.violations.find(
+            query, {"timestamp": 1, "label": 1, "points": 1, "expiry_date": 1}
+        ).sort([("timestamp", 1), ("_id", 1)])
+        rewards = async_db.rewards.find(
+            query, {"timestamp": 1, "amount": 1, "violation_reported": 1}
+        ).sort([("timestamp", 1), ("_id", 1)])
+        return summaries.build_summary(plate_no, await violations.to_list(), await rewards.to_list(), swept_until)
+
+    async def replace_summary(self, summary):
+        await async_db.driver_summaries.replace_one({"plate_no": summary["plate_no"]}, summary, upsert=True)
+        return await self.find_stored_summary(summary["plate_no"])
+
+    async def list_summary_plates(self):
+        plates = set(await async_db.violations.distinct("plate_no"))
+        plates.update(await async_db.rewards.distinct("plate_no"))
+        plates.update(await async_db.driver_summaries.distinct("plate_no"))
+        return sorted(plates)
+
+    # --- E. EMAIL OUTBOX ---
+    async def claim_email_job(self, now, lease_until):
+        return await async_db.violations.find_one_and_update(
+            {
+                "email_status": EMAIL_PENDING,
+                "$or": [{"email_lease_until": None}, {"email_lease_until": {"$lt": now}}]
+            },
+            {
+                "$set": {"email_lease_until": lease_until},
+                "$inc": {"email_attempts": 1}
+            },
+            sort=[("timestamp", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def complete_email_job(self, job, status, text, completed_at):
+        # Only the lease holder may complete the job
+        await async_db.violations.update_one(
+            {"_id": job["_id"], "email_status": EMAIL_PENDING, "email_lease_until": job["email_lease_until"]},
+            {
+                "$set": {"email_status": status, "generated_email": text, "email_completed_at": completed_at},
+                "$unset": {"email_lease_until": ""}
+            }
+        )
+
+    # --- F. REVENUE LEDGER ---
+    async def record_revenue(self, entries):
+        if not entries:
+            return
+        new_entries, error = entries, None
+        try:
+            await async_db.revenue_ledger.insert_many(entries, ordered=False)
+        except BulkWriteError as bwe:
+            write_errors = bwe.details.get("writeErrors", [])
+            failed = {err["index"] for err in write_errors}
+            new_entries = [e for i, e in enumerate(entries) if i not in failed]
+            # Duplicate keys are already in the ledger (a retried write or a backfill):
+            # never count twice. Anything else is raised once the inserted entries are rolled up
+            if any(err.get("code") != DUPLICATE_KEY for err in write_errors):
+                error = bwe
+        if new_entries:
+            now = datetime.now()
+            await async_db.revenue_rollups.bulk_write([
+                UpdateOne({"period": period, "key": key}, {"$inc": inc, "$set": {"updated_at": now}}, upsert=True)
+                for (period, key), inc in rollup_increments(new_entries).items()
+            ], ordered=False)
+        if error is not None:
+            raise error
+
+    async def find_revenue_rollups(self, period, keys):
+        return await async_db.revenue_rollups.find(
+            {"period": period, "key": {"$in": list(keys)}}, {"_id": 0, "updated_at": 0}
+        ).to_list()
+
+    async def find_revenue_rollups_from(self, period, first_key=None):
+        query = {"period": period}
+        if first_key:
+            query["key"] = {"$gte": first_key}
+        return await async_db.revenue_rollups.find(query, {"_id": 0, "updated_at": 0}).to_list()
+
+    async def revenue_ledger_totals(self, period, since=None):
+        pipeline = []
+        if since:
+            pipeline.append({"$match": {"timestamp": {"$gte": since}}})
+        pipeline.append({"$group": {
+            "_id": {"$dateToString": {"format": PERIOD_FORMATS[period], "date": "$timestamp"}},
+            "violations": {"$sum": 1},
+            **{field: {"$sum": f"${field}"} for field in ROLLUP_FIELDS[1:]},
+        }})
+        cursor = await async_db.revenue_ledger.aggregate(pipeline)
+        return {row["_id"]: row async for row in cursor}
+
+    async def replace_revenue_rollup(self, period, key, totals):
+        await async_db.revenue_rollups.replace_one(
+            {"period": period, "key": key},
+            {"period": period, "key": key, **totals, "updated_at": datetime.now()},
+            upsert=True
+        )
+
+    async def iter_violations_without_ledger(self, since=None, batch_size=EXPORT_BATCH_SIZE):
+        query = {"timestamp": {"$gte": since}} if since else {}
+        fields = {"plate_no": 1, "type": 1, "points": 1, "timestamp": 1}
+        batch = []
+        async with async_db.violations.find(query, fields, batch_size=batch_size) as cursor:
+            async for v in cursor:
+                batch.append(v)
+                if len(batch) >= batch_size:
+                    missing = await self._without_ledger(batch)
+                    if missing:
+                        yield missing
+                    batch = []
+        if batch:
+            missing = await self._without_ledger(batch)
+            if missing:
+                yield missing
+
+    async def _without_ledger(self, violations):
+        ids = [v["_id"] for v in violations]
+        present = {e["_id"] async for e in async_db.revenue_ledger.find({"_id": {"$in": ids}}, {"_id": 1})}
+        return [v for v in violations if v["_id"] not in present]
+
+    # --- G. FLEET ANALYTICS ---
+    async def fleet_risk(self, limit):
+        top = await (await async_db.driver_summaries.aggregate(top_risk_pipeline(limit))).to_list()
+        distribution = await async_db.driver_summaries.aggregate(risk_distribution_pipeline())
+        return {
+            "top": top,
+            "distribution": {row["_id"]: row["drivers"] async for row in distribution},
+            "drivers": await async_db.drivers.estimated_document_count(),
+        }
+
+    async def count_violation_types(self, start, end):
+        cursor = await async_db.violations.aggregate(violation_types_pipeline(start, end))
+        return {row["_id"]: row["count"] async for row in cursor}
+
+    # --- H. EXPIRY SWEEP ---
+    async def claim_expiry_sweep(self, now, lease_until):
+        try:
+            return await async_db.sweeper_state.find_one_and_update(
+                {"_id": EXPIRY_SWEEP_STATE, "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+                {"$set": {"lease_until": lease_until}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The state exists and its lease is held elsewhere
+            return None
+
+    async def complete_expiry_sweep(self, state, swept_until, now):
+        await async_db.sweeper_state.update_one(
+            {"_id": EXPIRY_SWEEP_STATE, "lease_until": state["lease_until"]},
+            {"$set": {"swept_until": swept_until, "last_run_at": now}, "$unset": {"lease_until": ""}}
+        )
+
+    async def expired_points_by_plate(self, start, end):
+        cursor = await async_db.violations.aggregate([
+            {"$match": {"expiry_date": {"$gte": start, "$lt": end}}},
+            {"$group": {"_id": "$plate_no", "points": {"$sum": "$points"}}},
+        ])
+        return {row["_id"]: row["points"] async for row in cursor}
+
+    async def move_expired_points(self, moved, since, now):
+        watermarks = {
+            s["plate_no"]: s.get("points_swept_until")
+            async for s in async_db.driver_summaries.find(
+                {"plate_no": {"$in": list(moved)}}, {"plate_no": 1, "points_swept_until": 1}
+            )
+        }
+        points = {}
+        for plate_no, watermark in watermarks.items():
+            start = summaries.points_swept_until(watermark, since)
+            if start == since:
+                points[plate_no] = moved[plate_no]
+            elif start < now:
+                # A run that did not complete already moved [since, start) into this summary
+                expiring = await self.find_violations_expiring_between(plate_no, start, now)
+                points[plate_no] = sum(v["points"] for v in expiring)
+        if not points:
+            return {}
+        # Each move only applies while the watermark it was computed from is still in place
+        await async_db.driver_summaries.bulk_write([
+            UpdateOne(
+                {"plate_no": plate_no, "points_swept_until": watermarks[plate_no]},
+                {"$inc": {"active_points": -amount, "expired_points": amount}, "$set": {"points_swept_until": now}}
+            )
+            for plate_no, amount in points.items()
+        ], ordered=False)
+        return {
+            s["plate_no"]: (points[s["plate_no"]], s.get("active_points", 0))
+            async for s in async_db.driver_summaries.find(
+                {"plate_no": {"$in": list(points)}, "points_swept_until": now}, {"plate_no": 1, "active_points": 1}
+            )
+        }
+
+    async def record_risk_transitions(self, transitions):
+        if transitions:
+            await async_db.risk_transitions.insert_many(transitions)
+
+    async def initialize_active_points(self, now):
+        updated = 0
+        async for summary in async_db.driver_summaries.find({}, {"plate_no": 1, "expiry_buckets": 1}):
+            boundary = summaries.boundary_range(summary, now)
+            boundary_violations = await self.find_violations_expiring_between(
+                summary["plate_no"], *boundary
+            ) if boundary else []
+            active, expired = summaries.split_points(summary, now, boundary_violations)
+            await async_db.driver_summaries.update_one(
+                {"_id": summary["_id"]},
+                {"$set": {"active_points": active, "expired_points": expired, "points_swept_until": now}}
+            )
+            updated += 1
+        return updated
+
+    # --- I. RULE SETS ---
+    async def find_rule_set(self, version=None):
+        if version is not None:
+            return await async_db.rule_sets.find_one({"version": version}, {"_id": 0})
+        # Two are active for a moment while one is activated (see activate_rule_set)
+        return await async_db.rule_sets.find_one({"active": True}, {"_id": 0}, sort=[("activated_at", DESCENDING)])
+
+    async def list_rule_sets(self):
+        return await async_db.rule_sets.find({}, {"_id": 0, "rules": 0}).sort("version", 1).to_list()
+
+    async def ensure_rule_set(self, doc):
+        await async_db.rule_sets.update_one({"version": doc["version"]}, {"$setOnInsert": doc}, upsert=True)
+
+    async def latest_rule_set_version(self):
+        latest = await async_db.rule_sets.find_one({}, {"version": 1}, sort=[("version", DESCENDING)])
+        return latest["version"] if latest else None
+
+    async def insert_rule_set(self, doc):
+        try:
+            await async_db.rule_sets.insert_one(doc)
+        except DuplicateKeyError as e:
+            raise DuplicateRecordError(str(e))
+
+    async def activate_rule_set(self, version, now):
+        if not await async_db.rule_sets.find_one({"version": version}, {"_id": 1}):
+            return False
+        # Activate first: deactivating first would leave no active version in between,
+        # and scoring would fall back to (and cache) the built-in rules meanwhile
+        await async_db.rule_sets.update_one({"version": version}, {"$set": {"active": True, "activated_at": now}})
+        await async_db.rule_sets.update_many({"active": True, "version": {"$ne": version}}, {"$set": {"active": False}})
+        return True
+
+    # --- J. DASHCAM EVENTS ---
+    async def insert_violation_event(self, event):
+        try:
+            result = await async_db.violation_events.insert_one(event)
+        except DuplicateKeyError as e:
+            raise DuplicateRecordError(str(e))
+        return result.inserted_id
+
+    async def find_violation_event(self, event_id):
+        return await async_db.violation_events.find_one({"event_id": event_id})
+
+    async def find_claiming_events(self, plate_no, violation_type, start, end):
+        return await async_db.violation_events.find(
+            {
+                "plate_no": plate_no, "type": violation_type,
+                "event_time": {"$gte": start, "$lte": end},
+                "status": {"$in": list(CLAIMING_STATUSES)}
+            },
+            {"event_id": 1, "status": 1}
+        ).to_list()
+
+    async def update_violation_event(self, event, fields):
+        await async_db.violation_events.update_one({"_id": event["_id"]}, {"$set": fields})
+
+    async def delete_violation_event(self, event):
+        await async_db.violation_events.delete_one({"_id": event["_id"]})
+
+    # --- K. RE-SCORING ---
+    async def find_rescore_job(self, job_id):
+        return await async_db.rescore_jobs.find_one({"_id": job_id})
+
+    async def save_rescore_job(self, job_id, fields):
+        await async_db.rescore_jobs.update_one({"_id": job_id}, {"$set": fields}, upsert=True)
+
+    async def delete_rescore_job(self, job_id):
+        await async_db.rescore_jobs.delete_one({"_id": job_id})
+
+    async def iter_violations_for_rescoring(self, after_plate, fields):
+        query = {"plate_no": {"$gt": after_plate}} if after_plate is not None else {}
+        # Served by the plate_no_type_timestamp_id index
+        cursor = async_db.violations.find(query, fields, batch_size=RESCORE_READ_BATCH).sort(
+            [("plate_no", 1), ("type", 1), ("timestamp", 1), ("_id", 1)]
+        )
+        async with cursor:
+            async for doc in cursor:
+                yield doc
+
+    async def update_violation_scores(self, updates):
+        if updates:
+            await async_db.violations.bulk_write(
+                [UpdateOne({"_id": _id}, {"$set": fields}) for _id, fields in updates], ordered=False
+            )
+
+    # --- L. LIFECYCLE ---
+    async def connect(self):
+        await database.connect()
+        await ensure_indexes()
+
+    async def close(self):
+        await database.close()
@@ -0,0 +1,31 @@
+# GoodRoad/backend/app/repositories/provider.py
+import os
+
+# "mongo" (default) or "memory" for load tests, profiling and CI without MongoDB
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "mongo")
+
+_repository = None
+
+
+def build_repository(name=STORAGE_BACKEND):
+    if name == "memory":
+        from app.repositories.memory_repository import InMemoryRepository
+        return InMemoryRepository()
+    if name == "mongo":
+        from app.repositories.mongo_repository import MongoRepository
+        return MongoRepository()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {name}")
+
+
+def get_repository():
+    """Shared repository for the app, built on first use (never connects here)."""
+    global _repository
+    if _repository is None:
+        _repository = build_repository()
+    return _repository
+
+
+def set_repository(repository):
+    """Swap the shared repository, e.g. set_repository(InMemoryRepository()) in tests."""
+    global _repository
+    _repository = repository
@@ -0,0 +1,51 @@
+# GoodRoad/backend/app/scripts/rebuild_summaries.py
+"""
+Recompute driver summaries from the raw violations/rewards collections.
+
+    python -m app.scripts.rebuild_summaries              # rebuild every plate
+    python -m app.scripts.rebuild_summaries --verify     # report drift only
+    python -m app.scripts.rebuild_summaries --plate WP-1234
+    python -m app.scripts.rebuild_summaries --counters   # also reset repeat counters
+"""
+import argparse
+import asyncio
+import json
+
+from app.repositories.provider import get_repository
+from app.services.summary.summary_service import rebuild_summary, verify_summary
+
+
+async def run(args):
+    repo = get_repository()
+    plates = args.plate or await repo.list_summary_plates()
+    mismatches = 0
+    for plate_no in plates:
+        if args.verify:
+            diff = await verify_summary(repo, plate_no)
+            if diff:
+                mismatches += 1
+                print(json.dumps(diff, default=str))
+        else:
+            await rebuild_summary(repo, plate_no)
+            if args.counters:
+                await repo.rebuild_repeat_counts(plate_no)
+    await repo.close()
+
+    if args.verify:
+        print(f"Verified {len(plates)} summaries, {mismatches} mismatched")
+        return 1 if mismatches else 0
+    print(f"Rebuilt {len(plates)} summaries")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or verify materialized driver summaries")
+    parser.add_argument("--plate", action="append", help="Only this plate (repeatable)")
+    parser.add_argument("--verify", action="store_true", help="Compare stored summaries without writing")
+    parser.add_argument("--counters", action="store_true", help="Also recompute per-plate repeat counters")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
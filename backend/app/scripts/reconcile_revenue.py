@@ -0,0 +1,49 @@
+# GoodRoad/backend/app/scripts/reconcile_revenue.py
+"""
+Check the revenue rollups against the raw ledger (and the ledger against violations).
+
+    python -m app.scripts.reconcile_revenue                     # report drift only
+    python -m app.scripts.reconcile_revenue --since 2026-01-01  # only recent buckets
+    python -m app.scripts.reconcile_revenue --backfill          # add missing ledger entries first
+    python -m app.scripts.reconcile_revenue --fix               # rewrite drifted rollups from the ledger
+
+Exits with status 1 if any rollup differed from the ledger.
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime
+
+from app.repositories.provider import get_repository
+from app.services.revenue.revenue_service import RevenueService
+
+
+async def run(args):
+    since = datetime.strptime(args.since, "%Y-%m-%d") if args.since else None
+    service = RevenueService()
+
+    if args.backfill:
+        added = await service.backfill_ledger(since)
+        print(f"Backfilled {added} ledger entries")
+
+    mismatches = await service.reconcile(since, fix=args.fix)
+    for m in mismatches:
+        print(json.dumps(m))
+    await get_repository().close()
+
+    action = "rewritten" if args.fix else "mismatched"
+    print(f"Reconciled revenue rollups, {len(mismatches)} {action}")
+    return 1 if mismatches and not args.fix else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile revenue rollups with the ledger")
+    parser.add_argument("--since", help="Only check buckets from this day on (YYYY-MM-DD)")
+    parser.add_argument("--backfill", action="store_true", help="Create ledger entries for violations missing one")
+    parser.add_argument("--fix", action="store_true", help="Overwrite drifted rollups with the ledger totals")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+# GoodRoad/backend/app/scripts/rescore.py
+"""
+Manage versioned scoring rules and re-score stored violations.
+
+    python -m app.scripts.rescore list
+    python -m app.scripts.rescore create rules.json --note "2027 tariff"   # prints the new version
+    python -m app.scripts.rescore run --version 2 --dry-run                # diff report, no writes
+    python -m app.scripts.rescore activate --version 2                     # new violations use v2
+    python -m app.scripts.rescore run --version 2                          # rewrite history (resumable)
+
+rules.json holds {"rules": {code: {weight, expiry, label}}, "multiplier_tiers": [{from, to, multiplier}]}.
+Omitted keys are taken from the built-in version 1. A run that stops half way
+continues from its checkpoint when started again with the same arguments;
+pass --restart to start over. NumPy is required for `run`.
+"""
+import argparse
+import asyncio
+import json
+
+from app.repositories.provider import get_repository
+from app.services.penalty.penalty_service import DEFAULT_RULE_SET
+from app.services.rules import rule_sets
+from app.services.rules.rescoring import RESCORE_CHUNK_SIZE, RescoringJob
+
+
+async def run(args):
+    repo = get_repository()
+    await rule_sets.ensure_rule_set(repo, DEFAULT_RULE_SET)
+
+    if args.command == "list":
+        for doc in await repo.list_rule_sets():
+            print(json.dumps(doc, default=str))
+
+    elif args.command == "create":
+        with open(args.file) as f:
+            spec = json.load(f)
+        version = await rule_sets.insert_rule_set(
+            repo,
+            spec.get("rules", DEFAULT_RULE_SET.rules),
+            spec.get("multiplier_tiers", DEFAULT_RULE_SET.multiplier_tiers),
+            args.note
+        )
+        print(f"Created rule set v{version} (inactive)")
+
+    elif args.command == "activate":
+        await rule_sets.activate_rule_set(repo, args.version)
+        print(f"Rule set v{args.version} is active")
+
+    elif args.command == "run":
+        doc = await repo.find_rule_set(args.version)
+        if doc is None:
+            raise SystemExit(f"Unknown rule set version: {args.version}")
+        job = RescoringJob(rule_sets.RuleSet.from_doc(doc), args.job, args.dry_run, args.chunk_size)
+        if args.restart:
+            await repo.delete_rescore_job(job.job_id)
+        report = await job.run()
+        print(json.dumps(report, indent=2, default=str))
+
+    await repo.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versioned scoring rules and bulk re-scoring")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show stored rule set versions")
+    create = sub.add_parser("create", help="Store a new (inactive) rule set from a JSON file")
+    create.add_argument("file")
+    create.add_argument("--note")
+    activate = sub.add_parser("activate", help="Score new violations with this version")
+    activate.add_argument("--version", type=int, required=True)
+    rescore = sub.add_parser("run", help="Re-score stored violations under a version")
+    rescore.add_argument("--version", type=int, required=True)
+    rescore.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    rescore.add_argument("--job", help="Checkpoint id (default rescore-v<version>[-dry-run])")
+    rescore.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    rescore.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
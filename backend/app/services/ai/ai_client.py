@@ -0,0 +1,217 @@
+# GoodRoad/backend/app/services/ai/ai_client.py
+import os
+import threading
+import time
+
+from app.services.metrics.metrics import ai_requests, timed
+
+# --- CONFIGURATION ---
+AI_TRANSPORT = os.environ.get("AI_TRANSPORT", "gemini")  # "gemini" or "stub"
+AI_PREFERRED_MODEL = os.environ.get("AI_PREFERRED_MODEL", "models/gemini-1.5-flash")
+AI_MODEL_TTL_SECONDS = float(os.environ.get("AI_MODEL_TTL_SECONDS", "3600"))
+AI_TIMEOUT_SECONDS = float(os.environ.get("AI_TIMEOUT_SECONDS", "10"))
+AI_BREAKER_THRESHOLD = int(os.environ.get("AI_BREAKER_THRESHOLD", "5"))
+AI_BREAKER_RESET_SECONDS = float(os.environ.get("AI_BREAKER_RESET_SECONDS", "60"))
+
+
+class AIUnavailableError(Exception):
+    """Raised without calling the transport while the circuit breaker is open."""
+
+
+class ModelNotFoundError(Exception):
+    """Raised by a transport when the model no longer exists (e.g. retired by Google)."""
+
+
+# --- A. TRANSPORTS ---
+class GeminiTransport:
+    """Talks to Google Gemini. GenerativeModel objects are built once per model name."""
+
+    def __init__(self, api_key=None):
+        import google.generativeai as genai
+        from google.api_core.exceptions import NotFound
+        self._genai = genai
+        self._not_found = NotFound
+        self._genai.configure(api_key=api_key or os.environ.get("GEMINI_API_KEY", "YOUR_NEW_API_KEY_HERE"))
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def list_models(self, timeout):
+        return [
+            m.name for m in self._genai.list_models(request_options={"timeout": timeout})
+            if 'generateContent' in m.supported_generation_methods
+        ]
+
+    def generate(self, model_name, prompt, timeout):
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._models[model_name] = self._genai.GenerativeModel(model_name)
+        try:
+            response = model.generate_content(prompt, request_options={"timeout": timeout})
+        except self._not_found as e:
+            raise ModelNotFoundError(str(e)) from e
+        return response.text
+
+
+class StubTransport:
+    """Local stand-in for Gemini used in tests and load runs. Never touches the network."""
+
+    def __init__(self, models=None, reply=None, fail=False, latency=0.0):
+        self.models = models or ["models/gemini-1.5-flash"]
+        self.reply = reply
+        self.fail = fail
+        self.latency = latency
+        self.calls = 0
+        self.list_calls = 0
+
+    def list_models(self, timeout):
+        self.list_calls += 1
+        return list(self.models)
+
+    def generate(self, model_name, prompt, timeout):
+        self.calls += 1
+        if model_name not in self.models:
+            raise ModelNotFoundError(f"Stub model not found: {model_name}")
+        if self.latency:
+            time.sleep(min(self.latency, timeout))
+        if self.fail:
+            raise RuntimeError("Stub AI transport failure")
+        return self.reply if self.reply is not None else f"[stub:{model_name}]\n{prompt.strip()}"
+
+
+# --- B. CIRCUIT BREAKER ---
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures. While open, calls are rejected
+    immediately; after `reset_seconds` one trial call is let through (half-open).
+    """
+
+    def __init__(self, threshold=AI_BREAKER_THRESHOLD, reset_seconds=AI_BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+# --- C. CLIENT ---
+class AIClient:
+
+    def __init__(self, transport, preferred_model=AI_PREFERRED_MODEL, model_ttl=AI_MODEL_TTL_SECONDS,
+                 timeout=AI_TIMEOUT_SECONDS, breaker=None):
+        self.transport = transport
+        self.preferred_model = preferred_model
+        self.model_ttl = model_ttl
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._model_name = None
+        self._model_resolved_at = 0.0
+        self._lock = threading.Lock()
+
+    def _pick_model(self, available_models):
+        # Default preference
+        if self.preferred_model in available_models:
+            return self.preferred_model
+        # Fallback logic
+        for m in available_models:
+            if 'flash' in m or 'pro' in m:
+                return m
+        if available_models:
+            return available_models[0]
+        return self.preferred_model
+
+    def resolve_model(self):
+        """Returns the cached model name, refreshing it via list_models() once the TTL passes."""
+        with self._lock:
+            if self._model_name and time.monotonic() - self._model_resolved_at < self.model_ttl:
+                return self._model_name
+        with timed("ai.model_discovery"):
+            model_name = self._pick_model(self.transport.list_models(self.timeout))
+        with self._lock:
+            if model_name != self._model_name:
+                print(f"Using AI Model: {model_name}")
+            self._model_name = model_name
+            self._model_resolved_at = time.monotonic()
+        return model_name
+
+    def invalidate_model(self):
+        with self._lock:
+            self._model_name = None
+
+    def generate(self, prompt):
+        if not self.breaker.allow():
+            ai_requests.inc(outcome="circuit_open")
+            raise AIUnavailableError("AI circuit breaker is open")
+        try:
+            model_name = self.resolve_model()
+            with timed("ai.generate"):
+                text = self.transport.generate(model_name, prompt, self.timeout)
+        except Exception as e:
+            ai_requests.inc(outcome="error")
+            self.breaker.record_failure()
+            if isinstance(e, ModelNotFoundError):
+                # The model was retired; re-discover on the next call. Other failures
+                # (timeouts, outages) keep the cached model instead of paying for discovery
+                self.invalidate_model()
+            raise
+        self.breaker.record_success()
+        ai_requests.inc(outcome="success")
+        return text
+
+
+def build_transport(name=AI_TRANSPORT):
+    if name == "stub":
+        return StubTransport()
+    return GeminiTransport()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_ai_client():
+    """Shared client, built on first use so importing this module never touches Gemini."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = AIClient(build_transport())
+        return _default_client
+
+
+def set_ai_client(client):
+    """Swap the shared client (e.g. AIClient(StubTransport()) in tests)."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
@@ -1,19 +1,17 @@
-import os
-import google.generativeai as genai
 from datetime import datetime
 
+from app.services.ai.ai_client import get_ai_client
+
 # --- CONFIGURATION ---
-# IMPORTANT: Replace with your NEW API key from https://aistudio.google.com/app/apikey
+# IMPORTANT: Set GEMINI_API_KEY to your NEW API key from https://aistudio.google.com/app/apikey
 # The previous key was flagged as leaked. Generate a new one!
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "YOUR_NEW_API_KEY_HERE")
-
-genai.configure(api_key=GEMINI_API_KEY)
+# Transport, timeout, model cache TTL and circuit breaker settings live in ai_client.py.
 
-def generate_fallback_email(driver_name, plate_no, violation_label, points, expiry_date):
+def generate_fallback_email(driver_name, plate_no, violation_label, points, expiry_date, violation_time=None):
     """
     Generates a fallback email template when AI service is unavailable.
     """
-    current_time = datetime.now()
+    current_time = violation_time or datetime.now()
     return f"""Dear {driver_name},
 
 This is an official notification from the GoodRoad Traffic Enforcement System.
@@ -36,14 +34,14 @@ Safe Driving,
 GoodRoad Enforcement Team
 """
 
-def generate_violation_email(driver_name, driver_email, plate_no, violation_label, points, expiry_date):
+def generate_ai_email(driver_name, plate_no, violation_label, points, expiry_date, violation_time=None):
     """
     Generates a personalized warning email using Google Gemini AI.
-    Falls back to template if AI is unavailable.
+    Raises on any AI failure so callers can decide how to fall back.
     """
     
-    # Get the current time for the violation timestamp
-    current_time = datetime.now()
+    # Use the stored violation time when the email is generated later by a worker
+    current_time = violation_time or datetime.now()
 
     # 1. The Prompt
     prompt = f"""
@@ -70,38 +68,6 @@ def generate_violation_email(driver_name, driver_email, plate_no, violation_labe
     6. Keep it professional and concise.
     """
 
-    try:
-        # 2. AUTO-DISCOVERY: Find a working model
-        available_models = []
-        for m in genai.list_models():
-            if 'generateContent' in m.supported_generation_methods:
-                available_models.append(m.name)
-        
-        # Default preference
-        model_name = 'models/gemini-1.5-flash' 
-        
-        # Fallback logic
-        if model_name not in available_models:
-            for m in available_models:
-                if 'flash' in m:
-                    model_name = m
-                    break
-                elif 'pro' in m:
-                    model_name = m
-                    break
-            else:
-                if available_models:
-                    model_name = available_models[0]
-        
-        print(f"Using AI Model: {model_name}")
-
-        # 3. Call the Model
-        model = genai.GenerativeModel(model_name)
-        response = model.generate_content(prompt)
-        return response.text
-
-    except Exception as e:
-        print(f"AI Error: {e}")
-        print("Using fallback email template...")
-        # Return fallback template instead of error message
-        return generate_fallback_email(driver_name, plate_no, violation_label, points, expiry_date)
\ No newline at end of file
+    # 2. Call the Model (model discovery is cached and failures trip a
+    #    circuit breaker inside the shared AI client)
+    return get_ai_client().generate(prompt)
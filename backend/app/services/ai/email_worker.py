@@ -0,0 +1,129 @@
+# GoodRoad/backend/app/services/ai/email_worker.py
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from app.models.records import EMAIL_DONE, EMAIL_FAILED, EMAIL_FALLBACK
+from app.repositories.provider import get_repository
+from app.services.metrics.metrics import ai_fallbacks, timed
+from app.services.ai.ai_service import generate_ai_email, generate_fallback_email
+from app.services.penalty.profile_cache import profile_cache
+
+# --- CONFIGURATION ---
+# Workers are asyncio tasks that go through the storage repository.
+# Violations are stored with email_status "pending" (the outbox, statuses in
+# app/models/records.py). Workers claim one job at a time by taking a lease on
+# it; if a worker crashes or the app restarts, the lease expires and another
+# worker picks the job up again.
+EMAIL_WORKER_CONCURRENCY = int(os.environ.get("EMAIL_WORKER_CONCURRENCY", "4"))
+EMAIL_WORKER_POLL_SECONDS = float(os.environ.get("EMAIL_WORKER_POLL_SECONDS", "2"))
+EMAIL_JOB_LEASE_SECONDS = int(os.environ.get("EMAIL_JOB_LEASE_SECONDS", "120"))
+EMAIL_JOB_MAX_ATTEMPTS = int(os.environ.get("EMAIL_JOB_MAX_ATTEMPTS", "3"))
+
+
+class EmailWorkerPool:
+
+    def __init__(self, concurrency=EMAIL_WORKER_CONCURRENCY, poll_seconds=EMAIL_WORKER_POLL_SECONDS,
+                 lease_seconds=EMAIL_JOB_LEASE_SECONDS, max_attempts=EMAIL_JOB_MAX_ATTEMPTS, repository=None):
+        self.concurrency = max(1, concurrency)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._repository = repository
+        self._wake = None
+        self._tasks = []
+        self._stopping = False
+
+    @property
+    def repo(self):
+        return self._repository or get_repository()
+
+    # --- A. LIFECYCLE ---
+    def start(self):
+        """Starts the workers as tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"email-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        print(f"Email worker pool started ({self.concurrency} workers)")
+
+    async def stop(self):
+        # The flag ends the loop even if a cancel lands just as wait_for() finishes
+        # and gets swallowed (asyncio.wait_for on Python < 3.12)
+        self._stopping = True
+        self.notify()
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers right away instead of waiting for the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    # --- B. JOB HANDLING ---
+    async def claim_next(self):
+        """Atomically lease the oldest pending job whose lease is free or expired."""
+        now = datetime.now()
+        return await self.repo.claim_email_job(now, now + timedelta(seconds=self.lease_seconds))
+
+    async def process(self, job):
+        if job.get("email_attempts", 1) > self.max_attempts:
+            await self._finish(job, EMAIL_FAILED, None)
+            return
+
+        driver = await self.repo.find_driver(job["plate_no"])
+        if not driver:
+            await self._finish(job, EMAIL_FAILED, None)
+            return
+
+        args = (driver["name"], job["plate_no"], job["label"], job["points"], job["expiry_date"], job["timestamp"])
+        try:
+            # Gemini calls block, so they run on a thread; concurrency is bounded by the pool size
+            text, status = await asyncio.to_thread(generate_ai_email, *args), EMAIL_DONE
+        except Exception as e:
+            print(f"AI Error: {e}")
+            print("Using fallback email template...")
+            ai_fallbacks.inc()
+            with timed("ai.fallback"):
+                text, status = generate_fallback_email(*args), EMAIL_FALLBACK
+
+        await self._finish(job, status, text)
+
+    async def _finish(self, job, status, text):
+        await self.repo.complete_email_job(job, status, text, datetime.now())
+        # The email text shows up in the profile's recent violations
+        profile_cache.invalidate(job["plate_no"])
+
+    async def run_once(self):
+        """Claims and processes a single job. Returns False when the outbox is empty."""
+        job = await self.claim_next()
+        if job is None:
+            return False
+        await self.process(job)
+        return True
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                worked = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Leave the job leased; it is retried after the lease expires
+                print(f"Email worker error: {e}")
+                worked = False
+            if not worked:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+
+email_worker_pool = EmailWorkerPool()
@@ -0,0 +1,80 @@
+# GoodRoad/backend/app/services/analytics/analytics_service.py
+import os
+import time
+
+from app.models.records import RISK_THRESHOLDS, risk_level
+from app.repositories.provider import get_repository
+
+# --- CONFIGURATION ---
+# Fleet-wide numbers are computed by the storage backend (aggregation pipelines
+# on MongoDB) and cached for a short while; dashboards polling them do not
+# trigger a new aggregation every time. Risk is read from the active_points the
+# expiry sweeper keeps on each summary.
+ANALYTICS_CACHE_SECONDS = float(os.environ.get("ANALYTICS_CACHE_SECONDS", "60"))
+DEFAULT_TOP_LIMIT = 10
+MAX_TOP_LIMIT = 100
+RISK_LEVELS = ["Low"] + [level for _, level in reversed(RISK_THRESHOLDS)]
+
+
+# --- A. SERVICE ---
+class AnalyticsService:
+
+    def __init__(self, repository=None, cache_seconds=ANALYTICS_CACHE_SECONDS):
+        self._repository = repository
+        self.cache_seconds = cache_seconds
+        self._cache = {}  # key -> (expires_at, value)
+
+    @property
+    def repo(self):
+        return self._repository or get_repository()
+
+    async def _cached(self, key, load):
+        hit = self._cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        value = await load()
+        if self.cache_seconds > 0:
+            # Drop stale keys so ad-hoc date ranges do not pile up
+            now = time.monotonic()
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            self._cache[key] = (now + self.cache_seconds, value)
+        return value
+
+    async def _fleet_risk(self, limit):
+        return await self._cached(("fleet_risk", limit), lambda: self.repo.fleet_risk(limit))
+
+    async def get_top_risk_drivers(self, limit=DEFAULT_TOP_LIMIT):
+        limit = max(1, min(limit, MAX_TOP_LIMIT))
+        fleet = await self._fleet_risk(limit)
+        return {
+            "limit": limit,
+            "drivers": [
+                {**d, "active_points": round(d["active_points"], 2), "risk_level": risk_level(d["active_points"])}
+                for d in fleet["top"]
+            ],
+        }
+
+    async def get_risk_distribution(self):
+        fleet = await self._fleet_risk(DEFAULT_TOP_LIMIT)
+        counts = dict(fleet["distribution"])
+        # Registered drivers without a summary have no points at all
+        at_risk = sum(n for level, n in counts.items() if level != "Low")
+        counts["Low"] = max(counts.get("Low", 0), fleet["drivers"] - at_risk)
+        return {
+            "total_drivers": sum(counts.get(level, 0) for level in RISK_LEVELS),
+            "distribution": [{"risk_level": level, "drivers": counts.get(level, 0)} for level in RISK_LEVELS],
+        }
+
+    async def get_violation_type_counts(self, start, end):
+        """Counts per violation type for timestamps in [start, end)."""
+        if start >= end:
+            raise ValueError("start must be before end")
+        counts = await self._cached(
+            ("violation_types", start, end), lambda: self.repo.count_violation_types(start, end)
+        )
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "total": sum(counts.values()),
+            "types": [{"type": t, "count": n} for t, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))],
+        }
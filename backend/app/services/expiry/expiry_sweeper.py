@@ -0,0 +1,111 @@
+# GoodRoad/backend/app/services/expiry/expiry_sweeper.py
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from app.models.records import risk_level
+from app.repositories.provider import get_repository
+
+# --- CONFIGURATION ---
+# Each driver summary stores active_points / expired_points. New violations are
+# added as active; this sweeper moves them to expired once their expiry_date has
+# passed. Every run only reads violations with expiry_date in
+# [swept_until, now) (expiry_date index), so its cost follows the number of
+# newly expired violations, not the size of the history. The progress
+# (swept_until) and a lease live in one sweeper state record, so only one app
+# process sweeps at a time. Each summary also keeps the end of the last window
+# moved into it (points_swept_until), so a window retried after a failure never
+# moves the same points twice.
+EXPIRY_SWEEP_SECONDS = float(os.environ.get("EXPIRY_SWEEP_SECONDS", "60"))
+EXPIRY_SWEEP_LEASE_SECONDS = int(os.environ.get("EXPIRY_SWEEP_LEASE_SECONDS", "300"))
+
+
+def risk_transitions(applied, now):
+    """Risk-level changes caused by moving points from active to expired ({plate: (points, active after)})."""
+    transitions = []
+    for plate_no, (points, active) in applied.items():
+        before, after = risk_level(active + points), risk_level(active)
+        if before != after:
+            transitions.append({
+                "plate_no": plate_no,
+                "from_level": before,
+                "to_level": after,
+                "active_points": round(active, 2),
+                "reason": "expiry",
+                "at": now,
+            })
+    return transitions
+
+
+# --- A. SWEEPER ---
+class ExpirySweeper:
+
+    def __init__(self, interval=EXPIRY_SWEEP_SECONDS, lease_seconds=EXPIRY_SWEEP_LEASE_SECONDS, repository=None):
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self._repository = repository
+        self._task = None
+
+    @property
+    def repo(self):
+        return self._repository or get_repository()
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="expiry-sweeper")
+            print(f"Expiry sweeper started (every {self.interval:g}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_once(self, now=None):
+        """Sweeps everything that expired since the last run. Returns a report, or None if leased elsewhere."""
+        now = now or datetime.now()
+        # BSON dates keep milliseconds; a finer cut would re-read the tail of this window next time
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        state = await self.repo.claim_expiry_sweep(now, now + timedelta(seconds=self.lease_seconds))
+        if state is None:
+            return None
+
+        since = state.get("swept_until")
+        if since is None:
+            initialized = await self.repo.initialize_active_points(now)
+            await self.repo.complete_expiry_sweep(state, now, now)
+            print(f"Expiry sweeper initialized active/expired points for {initialized} drivers")
+            return {"initialized": initialized, "swept_until": now}
+
+        moved = await self.repo.expired_points_by_plate(since, now)
+        applied, transitions = {}, []
+        if moved:
+            # Summaries remember how far they were swept, so a failure from here on
+            # only means the next run retries the window without moving points twice
+            applied = await self.repo.move_expired_points(moved, since, now)
+            transitions = risk_transitions(applied, now)
+            await self.repo.record_risk_transitions(transitions)
+        await self.repo.complete_expiry_sweep(state, now, now)
+        return {
+            "since": since,
+            "swept_until": now,
+            "plates": len(applied),
+            "points": round(sum(points for points, _ in applied.values()), 2),
+            "transitions": len(transitions),
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                report = await self.run_once()
+                if report and report.get("transitions"):
+                    print(f"Expiry sweep: {report['plates']} drivers, {report['transitions']} risk level changes")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The lease runs out and the next run (here or elsewhere) retries the window
+                print(f"Expiry sweeper error: {e}")
+            await asyncio.sleep(self.interval)
+
+
+expiry_sweeper = ExpirySweeper()
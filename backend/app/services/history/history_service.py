@@ -0,0 +1,78 @@
+# GoodRoad/backend/app/services/history/history_service.py
+import base64
+import json
+from datetime import datetime
+
+from bson.objectid import ObjectId
+
+from app.repositories.provider import get_repository
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+# Projection for history pages (the generated email body is left out; fetch it
+# via GET /violation/{id}/email when needed)
+HISTORY_FIELDS = [
+    "plate_no", "type", "label", "weight", "multiplier", "points",
+    "timestamp", "expiry_date", "email_status"
+]
+
+EXPORT_KINDS = ("violations", "rewards")
+
+
+def encode_cursor(record):
+    """Opaque keyset cursor for the (timestamp, _id) of the last record on a page."""
+    raw = json.dumps({"t": record["timestamp"].isoformat(), "id": str(record["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(token):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return datetime.fromisoformat(data["t"]), ObjectId(data["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class HistoryService:
+
+    def __init__(self, repository=None):
+        self._repository = repository
+
+    @property
+    def repo(self):
+        return self._repository or get_repository()
+
+    # --- A. PAGINATED HISTORY ---
+    async def get_violation_history(self, plate_no: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+        """Newest-first page of violations; pass `next_cursor` back to get the next page."""
+        if not await self.repo.find_driver(plate_no):
+            return None
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        before = decode_cursor(cursor) if cursor else None
+
+        # Ask for one extra record to know whether another page exists
+        items = await self.repo.find_violations_page(plate_no, before, limit + 1, HISTORY_FIELDS)
+        has_more = len(items) > limit
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1]) if has_more else None
+
+        for item in items:
+            item["_id"] = str(item["_id"])
+        return {"plate_no": plate_no, "items": items, "next_cursor": next_cursor}
+
+    # --- B. NDJSON EXPORT ---
+    async def export_ndjson(self, kinds=EXPORT_KINDS, plate_no=None, start=None, end=None, record_type=None):
+        """Yields one JSON line per record; nothing is buffered beyond the cursor batch."""
+        for kind in kinds:
+            async for doc in self.repo.iter_records(kind, plate_no, start, end, record_type):
+                doc["kind"] = kind[:-1]  # "violation" / "reward"
+                yield json.dumps(doc, default=_json_default) + "\n"
@@ -0,0 +1,138 @@
+# GoodRoad/backend/app/services/ingestion/ingestion_service.py
+import os
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+from app.models.records import EVENT_ACCEPTED, EVENT_NEAR_DUPLICATE, EVENT_RECEIVED
+from app.repositories.base import DuplicateRecordError
+from app.repositories.provider import get_repository
+from app.services.penalty.penalty_service import PenaltyService, active_rules
+from app.services.penalty.profile_cache import profile_cache
+
+# --- CONFIGURATION ---
+# Dashcam submissions (ViolationEvent) are recorded in violation_events before
+# anything is scored. Two checks run first, and a submission that fails either
+# one is answered without touching scoring, the AI email or rewards:
+#   - the same eventId again (detector retry): unique event_id index
+#   - the same plate and violation type within DEDUP_WINDOW_SECONDS of an
+#     earlier event (several dashcams, one incident): (plate_no, type, event_time) index
+# The first submission of an incident is scored once and its reporter is rewarded.
+DEDUP_WINDOW_SECONDS = int(os.environ.get("DEDUP_WINDOW_SECONDS", "120"))
+
+
+def parse_event_time(value):
+    """ISO 8601 eventTime -> naive local datetime (records store datetime.now() values)."""
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid eventTime: {value}")
+    return dt.astimezone().replace(tzinfo=None) if dt.tzinfo else dt
+
+
+# --- A. SERVICE ---
+class IngestionService:
+
+    def __init__(self, repository=None):
+        self._repository = repository
+        self.penalties = PenaltyService(repository)
+
+    @property
+    def repo(self):
+        return self._repository or get_repository()
+
+    async def ingest(self, event):
+        """
+        Records one ViolationEvent (a dict of its fields) and scores it unless it
+        repeats an earlier submission. The violation is dated at eventTime (capped at
+        now), so a late upload is charted and expires from when it happened. Returns
+        {"status": "accepted" | "duplicate" | "near_duplicate", ...}; raises ValueError
+        for invalid or unregistered input, or an event already past its expiry.
+        """
+        event_time = parse_event_time(event["eventTime"])
+        plate_no, violation_type = event["plateNo"], event["violationType"]
+        rules = await active_rules.get(self.repo)
+        if violation_type not in rules.rules:
+            raise ValueError(f"Invalid Code: {violation_type}")
+
+        # 1. Exact duplicates bounce off the unique event_id index
+        record = {
+            "event_id": event["eventId"],
+            "plate_no": plate_no,
+            "type": violation_type,
+            "event_time": event_time,
+            "reporter_plate_no": event.get("reporterPlateNo"),
+            "status": EVENT_RECEIVED,
+            "received_at": datetime.now()
+        }
+        try:
+            await self.repo.insert_violation_event(record)
+        except DuplicateRecordError:
+            original = await self.repo.find_violation_event(event["eventId"])
+            return {
+                "status": "duplicate",
+                "event_id": event["eventId"],
+                "original_status": original["status"] if original else EVENT_RECEIVED,
+                "violation_id": str(original["violation_id"]) if original and original.get("violation_id") else None
+            }
+
+        # 2. Near duplicates: the earliest recorded event in the window wins, so two
+        #    submissions racing each other agree on which one is scored
+        window = timedelta(seconds=DEDUP_WINDOW_SECONDS)
+        claims = await self.repo.find_claiming_events(plate_no, violation_type, event_time - window, event_time + window)
+        first = min(claims, key=lambda e: e["_id"], default=record)
+        if first["_id"] != record["_id"]:
+            await self.repo.update_violation_event(
+                record, {"status": EVENT_NEAR_DUPLICATE, "duplicate_of": first["event_id"]}
+            )
+            return {"status": EVENT_NEAR_DUPLICATE, "event_id": record["event_id"], "duplicate_of": first["event_id"]}
+
+        # 3. Score it. The event records its violation_id as soon as the violation
+        #    exists, so a retry after a later failure is answered as a duplicate
+        #    instead of scoring the incident twice
+        async def claim_violation(violation_id):
+            record["violation_id"] = violation_id
+            await self.repo.update_violation_event(record, {"violation_id": violation_id})
+
+        try:
+            violation = await self.penalties.add_violation(
+                plate_no, violation_type, on_inserted=claim_violation, timestamp=event_time
+            )
+        except Exception:
+            # Nothing was scored (e.g. an unregistered plate): free the eventId and the window
+            if "violation_id" not in record:
+                await self.repo.delete_violation_event(record)
+            raise
+
+        # 4. Reward the reporter (not for reporting their own vehicle)
+        reporter = record["reporter_plate_no"]
+        reward, contributor = None, None
+        if reporter and reporter != plate_no:
+            contributor = await self.repo.add_contributor_upload(reporter)
+        if contributor:
+            reward = {
+                "plate_no": reporter,
+                "violation_reported": violation_type,
+                "amount": violation["penalty_split"]["reward"],
+                "violation_id": ObjectId(violation["_id"]),
+                "event_id": record["event_id"],
+                "timestamp": datetime.now()
+            }
+            await self.repo.insert_reward(reward)
+            await self.repo.apply_reward_to_summary(reward)
+            profile_cache.invalidate(reporter)
+            reward["_id"] = str(reward["_id"])
+            reward["violation_id"] = violation["_id"]
+
+        await self.repo.update_violation_event(record, {
+            "status": EVENT_ACCEPTED,
+            "violation_id": ObjectId(violation["_id"]),
+            "reward_id": ObjectId(reward["_id"]) if reward else None
+        })
+        return {
+            "status": EVENT_ACCEPTED,
+            "event_id": record["event_id"],
+            "violation": violation,
+            "reward": reward,
+            "contributor": contributor
+        }
@@ -0,0 +1,193 @@
+# GoodRoad/backend/app/services/metrics/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from pymongo import monitoring
+
+# --- CONFIGURATION ---
+# Process-local counters and latency histograms, rendered in the Prometheus text
+# format at GET /api/metrics. Updates take a short lock because AI calls record
+# from worker threads (asyncio.to_thread).
+#   http_request_duration_seconds{method, route}  - request middleware in main.py
+#   stage_duration_seconds{stage}                 - timed() blocks in the services
+#   mongo_commands_total{command, outcome}        - pymongo command monitoring
+#   ai_requests_total{outcome}, ai_fallbacks_total
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# --- A. METRIC TYPES ---
+class Counter:
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[n] for n in self.labelnames), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        series = self._series.get(tuple(labels[n] for n in self.labelnames))
+        return sum(series[0]) if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                running += n
+                le = (("le", _number(bound)),)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {running}")
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status")
+)
+http_latency = registry.histogram(
+    "http_request_duration_seconds", "Time until the response starts, by route template.", ("method", "route")
+)
+stage_latency = registry.histogram(
+    "stage_duration_seconds", "Time spent in each service stage (see timed()).", ("stage",)
+)
+mongo_commands = registry.counter(
+    "mongo_commands_total", "MongoDB commands sent, by command name and outcome.", ("command", "outcome")
+)
+mongo_latency = registry.histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trips, by command name.", ("command",)
+)
+ai_requests = registry.counter(
+    "ai_requests_total", "Gemini generate calls: success, error, or rejected by the open circuit breaker.", ("outcome",)
+)
+ai_fallbacks = registry.counter(
+    "ai_fallbacks_total", "Emails rendered from the fallback template after an AI failure."
+)
+
+
+# --- B. HOOKS ---
+def route_template(scope):
+    """
+    '/api/penalty/user/{plate_no}/full_profile' for a matched request, so plates do
+    not become label values. Included routers only know their own part of the
+    path, so the prefix is taken from the request path.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path_format", route.path)
+    try:
+        matched = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    return path[:-len(matched)] + template if path.endswith(matched) else template
+
+
+@contextmanager
+def timed(stage):
+    """Records the wall time of the block under stage_duration_seconds{stage}."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency.observe(time.perf_counter() - start, stage=stage)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Counts every command on the clients it is registered with (see database.py)."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_commands.inc(command=event.command_name, outcome="success")
+        mongo_latency.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        mongo_commands.inc(command=event.command_name, outcome="error")
+        mongo_latency.observe(event.duration_micros / 1e6, command=event.command_name)
+
+
+mongo_command_metrics = MongoCommandMetrics()
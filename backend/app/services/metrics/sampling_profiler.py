@@ -0,0 +1,76 @@
+# GoodRoad/backend/app/services/metrics/sampling_profiler.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# --- CONFIGURATION ---
+# Off by default. With SAMPLING_PROFILER=1 a daemon thread records the event
+# loop thread's Python stack every SAMPLING_PROFILER_INTERVAL_MS; the request
+# path never does extra work. GET /api/metrics/profile returns the counts as
+# collapsed stacks ("outer;inner;leaf count"), the input format of
+# flamegraph.pl and speedscope.
+SAMPLING_PROFILER = os.environ.get("SAMPLING_PROFILER", "0") == "1"
+SAMPLING_PROFILER_INTERVAL_MS = float(os.environ.get("SAMPLING_PROFILER_INTERVAL_MS", "10"))
+SAMPLING_PROFILER_MAX_DEPTH = 64
+
+
+def collapse(frame, max_depth=SAMPLING_PROFILER_MAX_DEPTH):
+    """'module:function;...' from the outermost frame to `frame`."""
+    names = []
+    while frame is not None and len(names) < max_depth:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+
+    def __init__(self, interval_ms=SAMPLING_PROFILER_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.samples = Counter()
+        self.started_at = None
+        self._target = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    # --- A. LIFECYCLE ---
+    def start(self):
+        """Samples the calling thread (the event loop when called from the lifespan)."""
+        if self._thread is not None:
+            return
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        print(f"Sampling profiler started ({self.interval * 1000:g} ms interval)")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.samples[collapse(frame)] += 1
+
+    # --- B. REPORT ---
+    def collapsed(self, reset=False):
+        samples = self.samples
+        if reset:
+            self.samples = Counter()
+        return "".join(f"{stack} {n}\n" for stack, n in samples.most_common())
+
+
+sampling_profiler = SamplingProfiler()
@@ -1,6 +1,11 @@
-from app.services.ai.ai_service import generate_violation_email
+from app.models import summaries
+from app.models.records import EMAIL_PENDING, contributor_level, ledger_entry, risk_level
+from app.services.metrics.metrics import timed
+from app.services.penalty.profile_cache import profile_cache
+from app.services.rules.rule_sets import ActiveRuleSet, RuleSet
+from app.repositories.base import DuplicateRecordError
+from app.repositories.provider import get_repository
 from datetime import datetime, timedelta
-from app.database import drivers_collection, violations_collection, rewards_collection
 from bson.objectid import ObjectId
 
 # --- 1. CONFIGURATION ---
@@ -17,11 +22,43 @@ VIOLATION_RULES = {
     "OBSTRUCTION":     {"weight": 2, "expiry": 60,  "label": "Traffic Obstruction"}
 }
 
+# Repeat multiplier for the Nth occurrence of the same violation type
+# (a 4th occurrence stays at 1.0)
+REPEAT_MULTIPLIER_TIERS = [
+    {"from": 2, "to": 2, "multiplier": 1.25},
+    {"from": 3, "to": 3, "multiplier": 1.5},
+    {"from": 5, "to": None, "multiplier": 2.0},
+]
+
+# Version 1 of the scoring rules; newer versions are stored in rule_sets (see rule_sets.py)
+DEFAULT_RULE_SET = RuleSet(1, VIOLATION_RULES, REPEAT_MULTIPLIER_TIERS, note="Built-in rules")
+active_rules = ActiveRuleSet(DEFAULT_RULE_SET)
+
+# Risk and contributor levels: see app/models/records.py
+
+def calculate_penalty_split(points):
+    # Calculate penalty split (Government 60%, Reward 25%, System 15%)
+    penalty_amount = points * 500  # Base penalty calculation (500 LKR per point)
+    return {
+        "government": round(penalty_amount * 0.60, 2),
+        "reward": round(penalty_amount * 0.25, 2),
+        "system": round(penalty_amount * 0.15, 2),
+        "total": round(penalty_amount, 2)
+    }
+
 class PenaltyService:
 
+    def __init__(self, repository=None):
+        # Storage backend (MongoDB by default, see app/repositories)
+        self._repository = repository
+
+    @property
+    def repo(self):
+        return self._repository or get_repository()
+
     # --- A. REGISTER VEHICLE ---
-    def register_vehicle(self, plate_no: str, owner_name: str, owner_email: str, vehicle_type: str):
-        existing = drivers_collection.find_one({"plate_no": plate_no})
+    async def register_vehicle(self, plate_no: str, owner_name: str, owner_email: str, vehicle_type: str):
+        existing = await self.repo.find_driver(plate_no)
         if existing:
             return {"status": "error", "msg": "Vehicle already registered"}
         
@@ -31,41 +68,53 @@ class PenaltyService:
             "email": owner_email, # Saving the email to MongoDB
             "vehicle_type": vehicle_type,
             "registered_at": datetime.now(),
-            "contributor_level": "Silver",
+            "contributor_level": contributor_level(0),
             "upload_count": 0
         }
         
-        result = drivers_collection.insert_one(new_driver)
-        new_driver["_id"] = str(result.inserted_id)
+        try:
+            inserted_id = await self.repo.insert_driver(new_driver)
+        except DuplicateRecordError:
+            # Lost a race with a concurrent registration (unique plate_no index)
+            return {"status": "error", "msg": "Vehicle already registered"}
+        # Violations and rewards then only ever $inc into an existing summary
+        await self.repo.create_summary(plate_no)
+        new_driver["_id"] = str(inserted_id)
         return {"status": "success", "driver": new_driver}
 
     # --- B. ADD VIOLATION ---
-    def add_violation(self, plate_no: str, violation_code: str):
+    async def add_violation(self, plate_no: str, violation_code: str, on_inserted=None, timestamp=None):
+        # on_inserted(violation_id) is awaited right after the insert, before the
+        # summary and ledger writes; `timestamp` is when the violation happened if
+        # it was reported later (see ingestion_service.py), else now
         # 1. SECURITY CHECK: Ensure Vehicle Exists
-        driver = drivers_collection.find_one({"plate_no": plate_no})
+        with timed("add.find_driver"):
+            driver = await self.repo.find_driver(plate_no)
         if not driver:
             raise ValueError(f"Vehicle '{plate_no}' is NOT registered in the system.")
 
-        # 2. Validate Violation Code
-        if violation_code not in VIOLATION_RULES:
+        # 2. Validate Violation Code (against the active rule set version)
+        with timed("add.rules"):
+            rules = await active_rules.get(self.repo)
+        if violation_code not in rules.rules:
             raise ValueError(f"Invalid Code: {violation_code}")
         
-        rule = VIOLATION_RULES[violation_code]
+        rule = rules.rules[violation_code]
+
+        now = datetime.now()
+        timestamp = min(timestamp, now) if timestamp else now
+        expiry_date = timestamp + timedelta(days=rule["expiry"])
+        if expiry_date <= now:
+            # Its points would be expired on arrival, behind the expiry sweeper
+            raise ValueError(f"Violation at {timestamp.isoformat()} expired before it was reported")
         
-        # 3. Count Repeats (Multiplier Logic)
-        count = violations_collection.count_documents({
-            "plate_no": plate_no, 
-            "type": violation_code
-        })
-        count += 1
+        # 3. Count Repeats (Multiplier Logic) - atomic per-plate, per-type counter
+        with timed("add.repeat_count"):
+            count = await self.repo.reserve_repeat_count(plate_no, violation_code)
         
-        multiplier = 1.0
-        if count == 2: multiplier = 1.25
-        elif count == 3: multiplier = 1.5
-        elif count >= 5: multiplier = 2.0
+        multiplier = rules.multiplier(count)
         
         points = rule["weight"] * multiplier
-        expiry_date = datetime.now() + timedelta(days=rule["expiry"])
         
         new_event = {
             "plate_no": plate_no,
@@ -74,127 +123,225 @@ class PenaltyService:
             "weight": rule["weight"],
             "multiplier": multiplier,
             "points": points,
-            "timestamp": datetime.now(),
-            "expiry_date": expiry_date
+            "timestamp": timestamp,
+            "expiry_date": expiry_date,
+            "rule_version": rules.version,
+            "email_status": EMAIL_PENDING
         }
         
-        result = violations_collection.insert_one(new_event)
-        new_event["_id"] = str(result.inserted_id)
+        try:
+            with timed("add.insert"):
+                inserted_id = await self.repo.insert_violation(new_event)
+        except Exception:
+            await self.repo.release_repeat_counts({(plate_no, violation_code): 1})
+            raise
+        if on_inserted:
+            await on_inserted(inserted_id)
+        penalty_split = calculate_penalty_split(points)
+        with timed("add.summary"):
+            await self.repo.apply_violations_to_summaries([new_event])
+        # Ledger entry shares the violation's _id, so a replay or backfill cannot double count
+        with timed("add.revenue"):
+            await self.repo.record_revenue([ledger_entry(new_event, penalty_split)])
+        profile_cache.invalidate(plate_no)
+        new_event["_id"] = str(inserted_id)
 
-        # --- NEW: AI EMAIL GENERATION ---
-        # Fetch driver email to include in data (defaults to unknown if missing)
+        # AI email is generated by the background worker pool (see email_worker.py);
+        # the frontend polls GET /violation/{id}/email for the finished text.
         driver_email = driver.get("email", "unknown@email.com")
         
-        # Call the AI Service
-        ai_email_text = generate_violation_email(
-            driver_name=driver["name"],
-            driver_email=driver_email,
-            plate_no=plate_no,
-            violation_label=rule["label"],
-            points=points,
-            expiry_date=expiry_date
-        )
-
-        # Save the generated email back to the database violation record
-        violations_collection.update_one(
-            {"_id": result.inserted_id},
-            {"$set": {"generated_email": ai_email_text}}
-        )
-        
-        # Calculate penalty split (Government 60%, Reward 25%, System 15%)
-        penalty_amount = points * 500  # Base penalty calculation (500 LKR per point)
-        penalty_split = {
-            "government": round(penalty_amount * 0.60, 2),
-            "reward": round(penalty_amount * 0.25, 2),
-            "system": round(penalty_amount * 0.15, 2),
-            "total": round(penalty_amount, 2)
-        }
-        
         # Add to return object so frontend sees it immediately
-        new_event["generated_email"] = ai_email_text
         new_event["driver_email"] = driver_email
         new_event["penalty_split"] = penalty_split
         
         return new_event
 
+    # --- B2. ADD VIOLATIONS IN BULK (dashcam batches) ---
+    async def add_violations_batch(self, events):
+        """
+        Scores a batch of {plate_no, violation_code} events with one driver
+        lookup, one counter reservation per (plate, type) pair and one
+        unordered bulk insert.
+        Repeats inside the batch are counted in order, so the 2nd RED_LIGHT for
+        a plate in the same batch gets the 1.25 multiplier.
+        Emails are queued for the background worker pool like single adds.
+        Returns one result per input event, in input order.
+        """
+        if not events:
+            return []
+
+        plates = list({e["plate_no"] for e in events})
+
+        # 1. Resolve every plate in one query
+        with timed("add_batch.find_drivers"):
+            drivers = await self.repo.find_drivers(plates)
+        with timed("add_batch.rules"):
+            rules = await active_rules.get(self.repo)
+
+        # 2. Reserve repeat counts for every valid (plate, type) pair up front
+        amounts = {}
+        for e in events:
+            if e["plate_no"] in drivers and e["violation_code"] in rules.rules:
+                key = (e["plate_no"], e["violation_code"])
+                amounts[key] = amounts.get(key, 0) + 1
+        with timed("add_batch.repeat_counts"):
+            totals = await self.repo.reserve_repeat_counts(amounts)
+        # Counts before this batch; incremented below as we walk the batch in order
+        counts = {key: totals[key] - n for key, n in amounts.items()}
+
+        # 3. Score in memory, including repeats inside this batch
+        now = datetime.now()
+        results = []
+        new_events = []
+        event_index = []  # position in `results` of each queued insert
+        for e in events:
+            plate_no, violation_code = e["plate_no"], e["violation_code"]
+            driver = drivers.get(plate_no)
+            if not driver:
+                results.append({"status": "error", "msg": f"Vehicle '{plate_no}' is NOT registered in the system."})
+                continue
+            if violation_code not in rules.rules:
+                results.append({"status": "error", "msg": f"Invalid Code: {violation_code}"})
+                continue
+
+            rule = rules.rules[violation_code]
+            key = (plate_no, violation_code)
+            counts[key] = counts.get(key, 0) + 1
+            multiplier = rules.multiplier(counts[key])
+            points = rule["weight"] * multiplier
+            expiry_date = now + timedelta(days=rule["expiry"])
+
+            new_event = {
+                "plate_no": plate_no,
+                "type": violation_code,
+                "label": rule["label"],
+                "weight": rule["weight"],
+                "multiplier": multiplier,
+                "points": points,
+                "timestamp": now,
+                "expiry_date": expiry_date,
+                "rule_version": rules.version,
+                "email_status": EMAIL_PENDING
+            }
+            event_index.append(len(results))
+            new_events.append(new_event)
+            results.append({
+                "status": "success",
+                "violation": new_event,
+                "driver_email": driver.get("email", "unknown@email.com"),
+                "penalty_split": calculate_penalty_split(points)
+            })
+
+        # 4. One unordered write for the whole batch
+        if new_events:
+            failed = {}
+            try:
+                with timed("add_batch.insert"):
+                    errors = await self.repo.insert_violations(new_events)
+            except Exception:
+                # Not per-event failures (e.g. lost connection): give back every reservation
+                await self.repo.release_repeat_counts(amounts)
+                raise
+            for index, errmsg in errors:
+                position = event_index[index]
+                v = results[position]["violation"]
+                failed[(v["plate_no"], v["type"])] = failed.get((v["plate_no"], v["type"]), 0) + 1
+                results[position] = {"status": "error", "msg": errmsg}
+            await self.repo.release_repeat_counts(failed)
+            inserted = [r for r in results if r["status"] == "success"]
+            with timed("add_batch.summary"):
+                await self.repo.apply_violations_to_summaries([r["violation"] for r in inserted])
+            with timed("add_batch.revenue"):
+                await self.repo.record_revenue([ledger_entry(r["violation"], r["penalty_split"]) for r in inserted])
+            profile_cache.invalidate_many(r["violation"]["plate_no"] for r in inserted)
+
+        for r in results:
+            if r["status"] == "success":
+                r["violation"]["_id"] = str(r["violation"]["_id"])
+        return results
+
+    # --- B3. EMAIL STATUS (polled by the frontend) ---
+    async def get_violation_email(self, violation_id: str):
+        if not ObjectId.is_valid(violation_id):
+            return None
+        v = await self.repo.find_violation(violation_id, ["plate_no", "label", "email_status", "generated_email"])
+        if not v:
+            return None
+        return {
+            "_id": str(v["_id"]),
+            "plate_no": v["plate_no"],
+            "label": v["label"],
+            # Records created before the outbox existed already carry their email
+            "email_status": v.get("email_status", "done"),
+            "generated_email": v.get("generated_email")
+        }
+
     # --- C. GET PROFILE ---
-    def get_full_profile(self, plate_no: str):
-        driver = drivers_collection.find_one({"plate_no": plate_no})
+    async def get_full_profile(self, plate_no: str):
+        profile, _ = await self.load_profile(plate_no)
+        return profile
+
+    async def load_profile(self, plate_no: str):
+        """
+        Returns (profile, valid_until): the profile as served by full_profile and the
+        next moment its active/expired split changes on its own (None if never).
+        The route caches the rendered profile until then (see profile_cache.py).
+        """
+        with timed("profile.find_driver"):
+            driver = await self.repo.find_driver(plate_no)
         if not driver:
-            return None
+            return None, None
         
         driver["_id"] = str(driver["_id"])
 
-        # Get violations
-        cursor = violations_collection.find({"plate_no": plate_no})
-        my_violations = list(cursor)
-        
-        # Get rewards (dashcam submissions)
-        rewards_cursor = rewards_collection.find({"plate_no": plate_no})
-        my_rewards = list(rewards_cursor)
+        # Served from the materialized summary (see app/models/summaries.py), so the
+        # cost does not grow with the driver's history
+        with timed("profile.summary"):
+            summary = await self.repo.get_summary(plate_no)
         
         now = datetime.now()
-        active_points = 0
-        expired_points = 0
-        penalty_timeline = {}
-        type_counts = {}
-
-        for v in my_violations:
-            v["_id"] = str(v["_id"])
-            
-            month_key = v["timestamp"].strftime("%Y-%m")
-            penalty_timeline[month_key] = penalty_timeline.get(month_key, 0) + 1
-            type_counts[v["label"]] = type_counts.get(v["label"], 0) + 1
-
-            if v["expiry_date"] > now:
-                active_points += v["points"]
-            else:
-                expired_points += v["points"]
-
-        # Process rewards data
-        total_rewards = 0
-        reward_timeline = {}
-        reward_type_counts = {}
-        
-        for r in my_rewards:
-            r["_id"] = str(r["_id"])
-            total_rewards += r.get("amount", 0)
-            
-            month_key = r["timestamp"].strftime("%Y-%m")
-            reward_timeline[month_key] = reward_timeline.get(month_key, 0) + 1
-            
-            reward_type = r.get("violation_reported", "Other")
-            reward_type_counts[reward_type] = reward_type_counts.get(reward_type, 0) + 1
-
-        risk = "Low"
-        if active_points > 10: risk = "Moderate"
-        if active_points > 20: risk = "High"
-        if active_points > 30: risk = "Critical"
-        
-        # Determine contributor level based on rewards
-        contributor_level = "Bronze"
-        if len(my_rewards) >= 5: contributor_level = "Silver"
-        if len(my_rewards) >= 15: contributor_level = "Gold"
-        if len(my_rewards) >= 30: contributor_level = "Platinum"
+        boundary = summaries.boundary_range(summary, now)
+        with timed("profile.expiry_boundary"):
+            boundary_violations = await self.repo.find_violations_expiring_between(plate_no, *boundary) if boundary else []
+        active_points, expired_points = summaries.split_points(summary, now, boundary_violations)
+        valid_until = summaries.next_expiry(summary, now, boundary_violations)
 
-        return {
+        with timed("profile.recent_records"):
+            recent_violations = await self.repo.find_violations_by_ids(summary.get("recent_violation_ids", []))
+            recent_rewards = await self.repo.find_rewards_by_ids(summary.get("recent_reward_ids", []))
+        for record in recent_violations + recent_rewards:
+            record["_id"] = str(record["_id"])
+        for reward in recent_rewards:
+            # Rewards from dashcam events point at the violation they reported
+            if reward.get("violation_id"):
+                reward["violation_id"] = str(reward["violation_id"])
+
+        total_contributions = summary.get("total_contributions", 0)
+
+        risk = risk_level(active_points)
+
+        penalty_timeline = summary.get("penalty_timeline", {})
+        reward_timeline = summary.get("reward_timeline", {})
+
+        profile = {
             "profile": driver,
             "stats": {
                 "active_points": round(active_points, 2),
                 "expired_points": round(expired_points, 2),
                 "risk_level": risk,
-                "total_violations": len(my_violations),
-                "total_rewards": round(total_rewards, 2),
-                "total_contributions": len(my_rewards),
-                "contributor_level": contributor_level
+                "total_violations": summary.get("total_violations", 0),
+                "total_rewards": round(summary.get("total_rewards", 0), 2),
+                "total_contributions": total_contributions,
+                "contributor_level": contributor_level(total_contributions)
             },
             "charts": {
-                "penalty_timeline": [{"month": k, "count": v} for k, v in penalty_timeline.items()],
-                "reward_timeline": [{"month": k, "count": v} for k, v in reward_timeline.items()],
-                "violation_types": [{"type": k, "count": v} for k, v in type_counts.items()],
-                "reward_types": [{"type": k, "count": v} for k, v in reward_type_counts.items()],
+                "penalty_timeline": [{"month": k, "count": penalty_timeline[k]} for k in sorted(penalty_timeline)],
+                "reward_timeline": [{"month": k, "count": reward_timeline[k]} for k in sorted(reward_timeline)],
+                "violation_types": [{"type": k, "count": v} for k, v in summary.get("violation_types", {}).items()],
+                "reward_types": [{"type": k, "count": v} for k, v in summary.get("reward_types", {}).items()],
                 "points_split": [active_points, expired_points]
             },
-            "recent_violations": my_violations[-5:],
-            "recent_rewards": my_rewards[-5:]
-        }
\ No newline at end of file
+            "recent_violations": recent_violations,
+            "recent_rewards": recent_rewards
+        }
+        return profile, valid_until
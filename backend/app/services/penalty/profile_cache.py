@@ -0,0 +1,148 @@
+# GoodRoad/backend/app/services/penalty/profile_cache.py
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# --- CONFIGURATION ---
+# Rendered full_profile responses, kept per process. An entry is dropped when
+#   - a write for its plate invalidates it (violations, rewards, finished emails),
+#   - its TTL runs out, or
+#   - the next expiry_date among its active points passes (active/expired split changes).
+PROFILE_CACHE_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL_SECONDS = float(os.environ.get("PROFILE_CACHE_TTL_SECONDS", "60"))
+
+
+def make_etag(body):
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value covers `etag` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+class CachedProfile:
+    __slots__ = ("body", "etag", "expires_at")
+
+    def __init__(self, body, etag, expires_at):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ProfileCache:
+    """
+    LRU + TTL cache of rendered profile bodies keyed by plate.
+    Reads that race a write must not re-cache what they loaded before the write,
+    so a load is bracketed by begin()/put() and put() is skipped if the plate was
+    invalidated in between.
+    """
+
+    def __init__(self, max_size=PROFILE_CACHE_SIZE, ttl_seconds=PROFILE_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._entries = OrderedDict()
+        self._loading = {}   # plate -> loads in flight
+        self._dirty = set()  # plates invalidated while a load was in flight
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl.total_seconds() > 0
+
+    # --- A. READS ---
+    def get(self, plate_no, now=None):
+        entry = self._entries.get(plate_no)
+        if entry is not None and entry.expires_at <= (now or datetime.now()):
+            del self._entries[plate_no]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(plate_no)
+        self.hits += 1
+        return entry
+
+    # --- B. WRITES ---
+    def begin(self, plate_no):
+        """Marks the start of a load whose result will be handed to put()."""
+        self._loading[plate_no] = self._loading.get(plate_no, 0) + 1
+
+    def put(self, plate_no, body, valid_until=None, now=None):
+        """
+        Stores a body rendered by a load started with begin() and returns the entry.
+        `valid_until` is the next moment the profile changes on its own (next expiry).
+        """
+        stale = self._end_load(plate_no)
+        now = now or datetime.now()
+        expires_at = now + self.ttl
+        if valid_until is not None:
+            expires_at = min(expires_at, valid_until)
+        entry = CachedProfile(body, make_etag(body), expires_at)
+
+        if stale or not self.enabled or expires_at <= now:
+            return entry
+        self._entries[plate_no] = entry
+        self._entries.move_to_end(plate_no)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def discard(self, plate_no):
+        """Ends a load started with begin() that produced nothing to cache."""
+        self._end_load(plate_no)
+
+    def _end_load(self, plate_no):
+        """Returns True if the plate was invalidated while this load was in flight."""
+        remaining = self._loading.get(plate_no, 1) - 1
+        if remaining > 0:
+            self._loading[plate_no] = remaining
+            return plate_no in self._dirty
+        self._loading.pop(plate_no, None)
+        if plate_no in self._dirty:
+            self._dirty.discard(plate_no)
+            return True
+        return False
+
+    def invalidate(self, plate_no):
+        if self._entries.pop(plate_no, None) is not None:
+            self.invalidations += 1
+        if plate_no in self._loading:
+            self._dirty.add(plate_no)
+
+    def invalidate_many(self, plate_nos):
+        for plate_no in set(plate_nos):
+            self.invalidate(plate_no)
+
+    def clear(self):
+        self._entries.clear()
+
+    # --- C. STATS ---
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl.total_seconds(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+profile_cache = ProfileCache()
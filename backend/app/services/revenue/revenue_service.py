@@ -0,0 +1,125 @@
+# GoodRoad/backend/app/services/revenue/revenue_service.py
+from datetime import date, timedelta
+
+from app.models.records import PERIOD_FORMATS, ROLLUP_FIELDS, empty_rollup, ledger_entry
+from app.repositories.provider import get_repository
+from app.services.penalty.penalty_service import calculate_penalty_split
+
+# Reports read the day/month rollups kept next to the revenue ledger (documents in
+# app/models/records.py). A range total reads at most ~60 day buckets plus one
+# bucket per whole month, however many violations fall inside the range.
+MAX_ROLLUP_BUCKETS = 400
+TOLERANCE = 0.01  # LKR; rollups are float sums
+
+
+def bucket_plan(start: date, end: date):
+    """
+    Covers [start, end] (inclusive days) with the fewest buckets: whole calendar
+    months as month buckets, the partial months at either edge as day buckets.
+    """
+    plan = []
+    day = start
+    while day <= end:
+        if day.day == 1:
+            next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+            if next_month - timedelta(days=1) <= end:
+                plan.append(("month", day.strftime(PERIOD_FORMATS["month"])))
+                day = next_month
+                continue
+        plan.append(("day", day.strftime(PERIOD_FORMATS["day"])))
+        day += timedelta(days=1)
+    return plan
+
+
+def period_keys(period, start: date, end: date):
+    """Every bucket key of one period between start and end (inclusive)."""
+    keys = []
+    day = start
+    while day <= end:
+        key = day.strftime(PERIOD_FORMATS[period])
+        if not keys or keys[-1] != key:
+            keys.append(key)
+        day += timedelta(days=1)
+    return keys
+
+
+def _rounded(doc):
+    return {field: round(doc.get(field, 0), 2) for field in ROLLUP_FIELDS}
+
+
+# --- A. REPORTS ---
+class RevenueService:
+
+    def __init__(self, repository=None):
+        self._repository = repository
+
+    @property
+    def repo(self):
+        return self._repository or get_repository()
+
+    async def get_totals(self, start: date, end: date):
+        """Totals per stream for [start, end] (inclusive days), read from the rollups only."""
+        if start > end:
+            raise ValueError("start must not be after end")
+        plan = bucket_plan(start, end)
+        totals = empty_rollup()
+        for period in PERIOD_FORMATS:
+            keys = [key for p, key in plan if p == period]
+            if not keys:
+                continue
+            for doc in await self.repo.find_revenue_rollups(period, keys):
+                for field in ROLLUP_FIELDS:
+                    totals[field] += doc.get(field, 0)
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "buckets_read": len(plan),
+            "totals": _rounded(totals),
+        }
+
+    async def get_rollups(self, period: str, start: date, end: date):
+        """One row per day or month in [start, end], zero-filled."""
+        if start > end:
+            raise ValueError("start must not be after end")
+        keys = period_keys(period, start, end)
+        if len(keys) > MAX_ROLLUP_BUCKETS:
+            raise ValueError(f"Range too large (max {MAX_ROLLUP_BUCKETS} {period} buckets)")
+        found = {doc["key"]: doc for doc in await self.repo.find_revenue_rollups(period, keys)}
+        return {
+            "period": period,
+            "rows": [{"key": key, **_rounded(found.get(key, {}))} for key in keys],
+        }
+
+    # --- B. RECONCILIATION (see scripts/reconcile_revenue.py) ---
+    async def reconcile(self, since=None, fix=False):
+        """
+        Compares every rollup from `since` (a datetime, start of a day) on with the ledger.
+        Returns the mismatches; with fix=True the rollups are overwritten from the ledger.
+        """
+        mismatches = []
+        for period, fmt in PERIOD_FORMATS.items():
+            # Month buckets are only comparable as a whole
+            start = since.replace(day=1) if since and period == "month" else since
+            expected = await self.repo.revenue_ledger_totals(period, start)
+            stored = {
+                r["key"]: r
+                for r in await self.repo.find_revenue_rollups_from(period, start.strftime(fmt) if start else None)
+            }
+
+            for key in sorted(set(expected) | set(stored)):
+                want = _rounded(expected.get(key, {}))
+                have = _rounded(stored.get(key, {}))
+                if all(abs(want[f] - have[f]) <= TOLERANCE for f in ROLLUP_FIELDS):
+                    continue
+                mismatches.append({"period": period, "key": key, "stored": have, "expected": want})
+                if fix:
+                    await self.repo.replace_revenue_rollup(period, key, want)
+        return mismatches
+
+    async def backfill_ledger(self, since=None):
+        """Adds ledger entries for violations that have none (e.g. a crash between the two writes)."""
+        added = 0
+        async for violations in self.repo.iter_violations_without_ledger(since):
+            await self.repo.record_revenue([ledger_entry(v, calculate_penalty_split(v["points"])) for v in violations])
+            added += len(violations)
+        return added
@@ -0,0 +1,199 @@
+# GoodRoad/backend/app/services/rules/rescoring.py
+import os
+from datetime import datetime
+
+from app.repositories.provider import get_repository
+from app.services.summary import summary_service
+
+# --- CONFIGURATION ---
+# Re-scoring reads violations in (plate_no, type, timestamp, _id) order (the
+# plate_no_type_timestamp_id index on MongoDB) and scores them in columnar
+# chunks with NumPy. A chunk only ever holds whole plates, so the repeat count
+# of every record is known inside its chunk. After each chunk the job stores a checkpoint (last
+# plate done + running report) in rescore_jobs; a rerun with the same job id
+# continues after that plate.
+RESCORE_CHUNK_SIZE = int(os.environ.get("RESCORE_CHUNK_SIZE", "50000"))
+SAMPLE_LIMIT = 20
+# Live scoring takes timestamp and expiry_date from two datetime.now() calls;
+# expiry dates closer than this to the recomputed one are not a change
+EXPIRY_TOLERANCE_MS = 1000
+
+SCAN_FIELDS = {"plate_no": 1, "type": 1, "timestamp": 1, "weight": 1, "multiplier": 1, "points": 1, "expiry_date": 1}
+COLUMNS = ("_id",) + tuple(SCAN_FIELDS)
+
+
+def score_chunk(chunk, rule_set):
+    """
+    Vectorized scoring of one columnar chunk ({column: list}, rows sorted by plate,
+    type, timestamp). Returns new weight/multiplier/points/expiry_date arrays plus
+    `known` (type exists in the rule set) and `changed` masks.
+    """
+    import numpy as np
+
+    n = len(chunk["_id"])
+    codes = list(rule_set.rules)
+    code_index = {code: i for i, code in enumerate(codes)}
+    # -1 selects the sentinel slot at the end of each lookup table
+    type_idx = np.fromiter((code_index.get(t, -1) for t in chunk["type"]), dtype=np.int64, count=n)
+    known = type_idx >= 0
+
+    # Repeat count = position inside the run of equal (plate, type)
+    plates = np.asarray(chunk["plate_no"], dtype=object)
+    types = np.asarray(chunk["type"], dtype=object)
+    new_run = np.ones(n, dtype=bool)
+    new_run[1:] = (plates[1:] != plates[:-1]) | (types[1:] != types[:-1])
+    position = np.arange(n)
+    count = position - np.maximum.accumulate(np.where(new_run, position, 0)) + 1
+
+    weights = np.array([rule_set.rules[c]["weight"] for c in codes] + [0], dtype=np.float64)
+    expiry_days = np.array([rule_set.rules[c]["expiry"] for c in codes] + [0], dtype=np.int64)
+    tiers = rule_set.multiplier_tiers
+    multiplier = np.select(
+        [(count >= t["from"]) & (count <= (t["to"] if t.get("to") is not None else n)) for t in tiers],
+        [t["multiplier"] for t in tiers],
+        default=1.0
+    )
+    weight = weights[type_idx]
+    points = weight * multiplier
+    timestamp = np.asarray(chunk["timestamp"], dtype="datetime64[ms]")
+    expiry = timestamp + expiry_days[type_idx].astype("timedelta64[D]")
+
+    old_weight = np.asarray(chunk["weight"], dtype=np.float64)
+    old_multiplier = np.asarray(chunk["multiplier"], dtype=np.float64)
+    old_points = np.asarray(chunk["points"], dtype=np.float64)
+    old_expiry = np.asarray(chunk["expiry_date"], dtype="datetime64[ms]")
+    expiry_shift = np.abs((expiry - old_expiry).astype(np.int64))
+    changed = known & (
+        (weight != old_weight)
+        | ~np.isclose(multiplier, old_multiplier)
+        | ~np.isclose(points, old_points)
+        | (expiry_shift > EXPIRY_TOLERANCE_MS)
+    )
+    return {
+        "weight": weight, "multiplier": multiplier, "points": points, "expiry_date": expiry,
+        "old_points": old_points, "known": known, "changed": changed,
+    }
+
+
+def empty_report(rule_set, dry_run):
+    return {
+        "rule_version": rule_set.version,
+        "dry_run": dry_run,
+        "scanned": 0,
+        "changed": 0,
+        "unknown_type": 0,
+        "plates_changed": 0,
+        "points_before": 0.0,
+        "points_after": 0.0,
+        "by_type": {},
+        "samples": [],
+    }
+
+
+def add_to_report(report, chunk, scores):
+    import numpy as np
+
+    changed, known = scores["changed"], scores["known"]
+    report["scanned"] += len(chunk["_id"])
+    report["changed"] += int(changed.sum())
+    report["unknown_type"] += int((~known).sum())
+    report["points_before"] += float(scores["old_points"][known].sum())
+    report["points_after"] += float(scores["points"][known].sum())
+    report["plates_changed"] += len({chunk["plate_no"][i] for i in np.flatnonzero(changed)})
+
+    for i in np.flatnonzero(changed):
+        row = report["by_type"].setdefault(chunk["type"][i], {"changed": 0, "points_delta": 0.0})
+        row["changed"] += 1
+        row["points_delta"] += float(scores["points"][i] - scores["old_points"][i])
+        if len(report["samples"]) < SAMPLE_LIMIT:
+            report["samples"].append({
+                "_id": str(chunk["_id"][i]),
+                "plate_no": chunk["plate_no"][i],
+                "type": chunk["type"][i],
+                "timestamp": chunk["timestamp"][i],
+                "before": {"weight": chunk["weight"][i], "multiplier": chunk["multiplier"][i],
+                           "points": chunk["points"][i], "expiry_date": chunk["expiry_date"][i]},
+                "after": {"weight": float(scores["weight"][i]), "multiplier": float(scores["multiplier"][i]),
+                          "points": float(scores["points"][i]),
+                          "expiry_date": scores["expiry_date"][i].item()},
+            })
+
+
+class RescoringJob:
+    """
+    Re-scores every stored violation under `rule_set`. With dry_run=True nothing but the
+    job's report is written. Summaries of changed plates are rebuilt as the job goes.
+    The revenue ledger is left alone: it records what was actually charged.
+    """
+
+    def __init__(self, rule_set, job_id=None, dry_run=False, chunk_size=RESCORE_CHUNK_SIZE, repository=None):
+        self.rule_set = rule_set
+        self.dry_run = dry_run
+        self.chunk_size = max(1, chunk_size)
+        self.job_id = job_id or f"rescore-v{rule_set.version}" + ("-dry-run" if dry_run else "")
+        self._repository = repository
+
+    @property
+    def repo(self):
+        return self._repository or get_repository()
+
+    async def _load_checkpoint(self):
+        job = await self.repo.find_rescore_job(self.job_id)
+        if job and job["report"]["rule_version"] != self.rule_set.version:
+            raise ValueError(f"Job {self.job_id} was started for rule set v{job['report']['rule_version']}")
+        return job
+
+    async def _checkpoint(self, **fields):
+        await self.repo.save_rescore_job(self.job_id, {**fields, "updated_at": datetime.now()})
+
+    async def run(self):
+        job = await self._load_checkpoint()
+        if job and job["status"] == "done":
+            return job["report"]
+        report = job["report"] if job else empty_report(self.rule_set, self.dry_run)
+        last_plate = job.get("last_plate") if job else None
+
+        # A crash between the bulk update and the summary rebuild leaves these behind
+        for plate_no in (job or {}).get("pending_plates", []):
+            await summary_service.rebuild_summary(self.repo, plate_no)
+        await self._checkpoint(status="running", report=report, last_plate=last_plate, pending_plates=[])
+
+        chunk = {column: [] for column in COLUMNS}
+        async for doc in self.repo.iter_violations_for_rescoring(last_plate, SCAN_FIELDS):
+            # Only cut between plates so repeat counts stay exact
+            if len(chunk["_id"]) >= self.chunk_size and doc["plate_no"] != chunk["plate_no"][-1]:
+                await self._process(chunk, report)
+                chunk = {column: [] for column in COLUMNS}
+            for column in COLUMNS:
+                chunk[column].append(doc.get(column))
+        if chunk["_id"]:
+            await self._process(chunk, report)
+
+        await self._checkpoint(status="done", report=report, finished_at=datetime.now())
+        return report
+
+    async def _process(self, chunk, report):
+        import numpy as np
+
+        scores = score_chunk(chunk, self.rule_set)
+        add_to_report(report, chunk, scores)
+        changed_rows = np.flatnonzero(scores["changed"])
+
+        if not self.dry_run and len(changed_rows):
+            plates = sorted({chunk["plate_no"][i] for i in changed_rows})
+            await self._checkpoint(pending_plates=plates)
+            await self.repo.update_violation_scores([
+                (chunk["_id"][i], {
+                    "weight": self.rule_set.rules[chunk["type"][i]]["weight"],
+                    "multiplier": float(scores["multiplier"][i]),
+                    "points": float(scores["points"][i]),
+                    "expiry_date": scores["expiry_date"][i].item(),
+                    "rule_version": self.rule_set.version,
+                })
+                for i in changed_rows
+            ])
+            for plate_no in plates:
+                await summary_service.rebuild_summary(self.repo, plate_no)
+
+        await self._checkpoint(report=report, last_plate=chunk["plate_no"][-1], pending_plates=[])
+        print(f"Re-scored {report['scanned']} violations ({report['changed']} changed) up to {chunk['plate_no'][-1]}")
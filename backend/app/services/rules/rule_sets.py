@@ -0,0 +1,110 @@
+# GoodRoad/backend/app/services/rules/rule_sets.py
+import os
+import time
+from datetime import datetime
+
+# --- CONFIGURATION ---
+# Scoring rules are versioned. Version 1 is the built-in VIOLATION_RULES /
+# REPEAT_MULTIPLIER_TIERS (DEFAULT_RULE_SET in penalty_service.py); later versions
+# live in the rule_sets collection and the most recently activated one is
+# active. The app re-reads the
+# active version every RULES_CACHE_SECONDS, so an activation reaches every
+# process within that time.
+RULES_CACHE_SECONDS = float(os.environ.get("RULES_CACHE_SECONDS", "30"))
+RULE_FIELDS = ("weight", "expiry", "label")
+
+
+class RuleSet:
+    """
+    One version of the scoring rules: {code: {weight, expiry (days), label}} plus repeat
+    multiplier tiers [{"from": n, "to": m or None, "multiplier": x}]. The first tier that
+    contains the repeat count wins; counts outside every tier get 1.0.
+    """
+
+    def __init__(self, version, rules, multiplier_tiers, note=None, created_at=None):
+        self.version = version
+        self.rules = rules
+        self.multiplier_tiers = multiplier_tiers
+        self.note = note
+        self.created_at = created_at
+
+    def multiplier(self, count):
+        for tier in self.multiplier_tiers:
+            if count >= tier["from"] and (tier["to"] is None or count <= tier["to"]):
+                return tier["multiplier"]
+        return 1.0
+
+    def to_doc(self):
+        return {
+            "version": self.version,
+            "rules": self.rules,
+            "multiplier_tiers": self.multiplier_tiers,
+            "note": self.note,
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_doc(cls, doc):
+        return cls(doc["version"], doc["rules"], doc["multiplier_tiers"], doc.get("note"), doc.get("created_at"))
+
+
+def validate_rule_set(rules, multiplier_tiers):
+    """Raises ValueError if a proposed rule set cannot be used for scoring."""
+    if not rules:
+        raise ValueError("A rule set needs at least one violation type")
+    for code, rule in rules.items():
+        if "." in code or code.startswith("$"):
+            raise ValueError(f"Invalid violation code: {code}")
+        missing = [f for f in RULE_FIELDS if f not in rule]
+        if missing:
+            raise ValueError(f"{code}: missing {', '.join(missing)}")
+        if rule["weight"] < 0 or int(rule["expiry"]) != rule["expiry"] or rule["expiry"] < 0:
+            raise ValueError(f"{code}: weight must be >= 0 and expiry a whole number of days")
+    for tier in multiplier_tiers:
+        if tier.get("from", 0) < 1 or tier.get("multiplier", 0) <= 0:
+            raise ValueError(f"Invalid multiplier tier: {tier}")
+        if tier.get("to") is not None and tier["to"] < tier["from"]:
+            raise ValueError(f"Invalid multiplier tier: {tier}")
+
+
+# --- A. STORED VERSIONS (see scripts/rescore.py) ---
+async def ensure_rule_set(repo, rule_set):
+    """Stores a rule set under its version if that version is not stored yet (used for the built-in v1)."""
+    await repo.ensure_rule_set({**rule_set.to_doc(), "active": False})
+
+
+async def insert_rule_set(repo, rules, multiplier_tiers, note=None):
+    """Stores a new, inactive version and returns its number."""
+    validate_rule_set(rules, multiplier_tiers)
+    version = (await repo.latest_rule_set_version() or 1) + 1
+    rule_set = RuleSet(version, rules, multiplier_tiers, note, datetime.now())
+    # The unique version index turns a concurrent insert into an error instead of a clash
+    await repo.insert_rule_set({**rule_set.to_doc(), "active": False})
+    return version
+
+
+async def activate_rule_set(repo, version):
+    if not await repo.activate_rule_set(version, datetime.now()):
+        raise ValueError(f"Unknown rule set version: {version}")
+
+
+# --- B. ACTIVE RULE SET (scoring path) ---
+class ActiveRuleSet:
+    """Process-wide cache of the active rule set, falling back to `default` when none is stored."""
+
+    def __init__(self, default, ttl=RULES_CACHE_SECONDS):
+        self.default = default
+        self.ttl = ttl
+        self._rule_set = None
+        self._loaded_at = 0.0
+
+    async def get(self, repository):
+        if self._rule_set is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return self._rule_set
+        doc = await repository.find_rule_set()
+        self._rule_set = RuleSet.from_doc(doc) if doc else self.default
+        self._loaded_at = time.monotonic()
+        return self._rule_set
+
+    def invalidate(self):
+        self._rule_set = None
@@ -0,0 +1,29 @@
+# GoodRoad/backend/app/services/summary/summary_service.py
+from app.models.summaries import empty_summary
+
+# Rebuild / verify for materialized driver summaries (see app/models/summaries.py
+# for the document and its updates). Used by the rebuild_summaries script and the
+# re-scoring job; the repository recomputes a summary from the raw records.
+
+
+async def rebuild_summary(repo, plate_no):
+    """Overwrites the stored summary with one recomputed from the raw records."""
+    return await repo.replace_summary(await repo.compute_summary(plate_no))
+
+
+def _comparable(summary):
+    # Fields only appear in Mongo once something has been $inc'ed into them
+    out = {k: summary.get(k, default) for k, default in empty_summary(None).items() if k != "plate_no"}
+    for field in ("total_rewards", "active_points", "expired_points"):
+        out[field] = round(summary.get(field, 0), 2)
+    out["expiry_buckets"] = {k: round(v, 2) for k, v in summary.get("expiry_buckets", {}).items()}
+    return out
+
+
+async def verify_summary(repo, plate_no):
+    """Returns None when the stored summary matches the raw data, else both versions."""
+    stored = await repo.find_stored_summary(plate_no) or {}
+    fresh = await repo.compute_summary(plate_no)
+    if _comparable(stored) == _comparable(fresh):
+        return None
+    return {"plate_no": plate_no, "stored": _comparable(stored), "expected": _comparable(fresh)}
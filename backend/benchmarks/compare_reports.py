@@ -0,0 +1,60 @@
+# GoodRoad/backend/benchmarks/compare_reports.py
+"""
+Compare two penalty_api_bench JSON reports and flag latency/throughput regressions.
+
+    python -m benchmarks.compare_reports baseline.json candidate.json --threshold 0.2
+
+Exits with status 1 if any endpoint's p95/p99 latency grew, or its throughput
+dropped, by more than the threshold (a fraction, default 20%).
+"""
+import argparse
+import json
+
+
+def _change(old, new):
+    return (new - old) / old if old else 0.0
+
+
+def compare(baseline, candidate, threshold):
+    rows = []
+    for endpoint, new in candidate.get("endpoints", {}).items():
+        old = baseline.get("endpoints", {}).get(endpoint)
+        if not old:
+            continue
+        checks = [
+            ("p95_ms", old["latency_ms"]["p95"], new["latency_ms"]["p95"], 1),
+            ("p99_ms", old["latency_ms"]["p99"], new["latency_ms"]["p99"], 1),
+            ("throughput_rps", old["throughput_rps"], new["throughput_rps"], -1),
+        ]
+        for metric, before, after, direction in checks:
+            change = _change(before, after)
+            rows.append({
+                "endpoint": endpoint,
+                "metric": metric,
+                "baseline": before,
+                "candidate": after,
+                "change": round(change, 4),
+                "regression": change * direction > threshold,
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = compare(baseline, candidate, args.threshold)
+    print(json.dumps({"threshold": args.threshold, "comparisons": rows}, indent=2))
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
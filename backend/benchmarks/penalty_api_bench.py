@@ -0,0 +1,251 @@
+# GoodRoad/backend/benchmarks/penalty_api_bench.py
+"""
+Load test / benchmark for the penalty API. Runs the FastAPI app in-process
+(httpx ASGI transport) with Gemini stubbed out, against either the in-memory
+storage engine or a local MongoDB, and prints a JSON report.
+
+    cd backend
+    python -m benchmarks.penalty_api_bench                          # in-memory
+    python -m benchmarks.penalty_api_bench --storage mongo          # local MongoDB (MONGO_URI)
+    python -m benchmarks.penalty_api_bench --requests 5000 --concurrency 64 --output run.json
+
+With --storage mongo the data goes to --mongo-db (default "goodroad_bench"; an
+exported MONGO_DB_NAME is ignored), which is dropped before and after the run.
+Only names ending in "_bench" are accepted.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPORT_VERSION = 1
+BENCH_DB_SUFFIX = "_bench"
+
+
+# --- A. STATS ---
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, wall_seconds, errors=0):
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            "mean": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            "p50": round(percentile(values, 50) * 1000, 3),
+            "p95": round(percentile(values, 95) * 1000, 3),
+            "p99": round(percentile(values, 99) * 1000, 3),
+            "max": round(values[-1] * 1000, 3) if values else 0.0,
+        },
+    }
+
+
+# --- B. SYNTHETIC DATA ---
+def skewed_plate_picker(plates, rng, skew):
+    """Zipf-like choice: a few plates (fleet/taxi repeat offenders) get most of the events."""
+    weights = [1 / (rank + 1) ** skew for rank in range(len(plates))]
+    return lambda: rng.choices(plates, weights)[0]
+
+
+def violation_codes():
+    from app.services.penalty.penalty_service import VIOLATION_RULES
+    return list(VIOLATION_RULES)
+
+
+async def seed(service, plates, events, rng, skew, batch_size=1000):
+    """Registers the plates and loads a skewed violation history through the batch path."""
+    for plate_no in plates:
+        await service.register_vehicle(plate_no, f"Driver {plate_no}", f"{plate_no.lower()}@example.com", "car")
+    pick = skewed_plate_picker(plates, rng, skew)
+    codes = violation_codes()
+    for start in range(0, events, batch_size):
+        batch = [
+            {"plate_no": pick(), "violation_code": rng.choice(codes)}
+            for _ in range(min(batch_size, events - start))
+        ]
+        await service.add_violations_batch(batch)
+
+
+# --- C. LOAD RUNNER ---
+async def run_load(client, make_request, total, concurrency):
+    """Fires `total` requests with at most `concurrency` in flight; returns summary stats."""
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            i = next_index
+            next_index += 1
+            method, url, body = make_request(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400 and response.status_code != 304:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - wall_start, errors)
+
+
+async def profile_vs_history(service, history_lengths, repeats, rng):
+    """Times get_full_profile for drivers with exactly N violations each."""
+    codes = violation_codes()
+    rows = []
+    for length in history_lengths:
+        plate_no = f"HIST-{length}"
+        await service.register_vehicle(plate_no, f"Driver {plate_no}", "hist@example.com", "lorry")
+        for start in range(0, length, 1000):
+            await service.add_violations_batch([
+                {"plate_no": plate_no, "violation_code": rng.choice(codes)}
+                for _ in range(min(1000, length - start))
+            ])
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            await service.get_full_profile(plate_no)
+            timings.append(time.perf_counter() - started)
+        stats = summarize(timings, sum(timings))
+        rows.append({"history_length": length, "latency_ms": stats["latency_ms"]})
+    return rows
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+# --- D. MAIN ---
+async def drop_bench_database():
+    from app.database import get_async_client, MONGO_DB_NAME
+    # Second line of defence: never wipe a database that is not a benchmark one
+    if not MONGO_DB_NAME.endswith(BENCH_DB_SUFFIX):
+        raise RuntimeError(f"Refusing to drop '{MONGO_DB_NAME}': benchmark databases end in '{BENCH_DB_SUFFIX}'")
+    await get_async_client().drop_database(MONGO_DB_NAME)
+
+
+async def run(args):
+    import httpx
+
+    from app.main import app
+    from app.repositories.provider import get_repository, set_repository, build_repository
+    from app.services.ai.ai_client import AIClient, StubTransport, set_ai_client
+    from app.services.penalty.penalty_service import PenaltyService
+
+    rng = random.Random(args.seed)
+    set_ai_client(AIClient(StubTransport(latency=args.ai_latency_ms / 1000)))
+    set_repository(build_repository(args.storage))
+
+    report = {
+        "version": REPORT_VERSION,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "endpoints": {},
+    }
+
+    async with app.router.lifespan_context(app):
+        if args.storage == "mongo":
+            await drop_bench_database()
+            await get_repository().connect()  # recreate indexes on the fresh database
+
+        service = PenaltyService()
+        plates = [f"BENCH-{i:05d}" for i in range(args.drivers)]
+        seed_started = time.perf_counter()
+        await seed(service, plates, args.history, rng, args.skew)
+        report["seed_seconds"] = round(time.perf_counter() - seed_started, 3)
+
+        pick = skewed_plate_picker(plates, rng, args.skew)
+        codes = violation_codes()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            report["endpoints"]["POST /api/penalty/register"] = await run_load(
+                client,
+                lambda i: ("POST", "/api/penalty/register", {
+                    "plate_no": f"NEW-{i:06d}", "owner_name": "Bench", "email": "bench@example.com", "vehicle_type": "car"
+                }),
+                args.requests, args.concurrency
+            )
+            report["endpoints"]["POST /api/penalty/add"] = await run_load(
+                client,
+                lambda i: ("POST", "/api/penalty/add", {"plate_no": pick(), "violation_code": rng.choice(codes)}),
+                args.requests, args.concurrency
+            )
+            report["endpoints"]["GET /api/penalty/user/{plate_no}/full_profile"] = await run_load(
+                client,
+                lambda i: ("GET", f"/api/penalty/user/{pick()}/full_profile", None),
+                args.requests, args.concurrency
+            )
+
+        report["full_profile_vs_history"] = await profile_vs_history(
+            service, args.history_lengths, args.profile_repeats, rng
+        )
+
+        if args.storage == "mongo":
+            await drop_bench_database()
+
+    report["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GoodRoad penalty API")
+    parser.add_argument("--storage", choices=["memory", "mongo"], default="memory")
+    parser.add_argument("--drivers", type=int, default=200, help="Synthetic registered drivers")
+    parser.add_argument("--history", type=int, default=20000, help="Violations seeded before the run")
+    parser.add_argument("--skew", type=float, default=1.2, help="Zipf exponent for repeat offenders")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--history-lengths", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--profile-repeats", type=int, default=50)
+    parser.add_argument("--ai-latency-ms", type=float, default=0.0, help="Simulated Gemini latency")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongo-db", default="goodroad_bench",
+                        help=f"Throwaway database for --storage mongo, dropped before and after (must end in '{BENCH_DB_SUFFIX}')")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    if not args.mongo_db.endswith(BENCH_DB_SUFFIX):
+        parser.error(f"--mongo-db must end in '{BENCH_DB_SUFFIX}' (the benchmark drops it)")
+
+    # Must be set before app modules read their configuration
+    os.environ["STORAGE_BACKEND"] = args.storage
+    os.environ["AI_TRANSPORT"] = "stub"
+    # Always a benchmark-only database, whatever MONGO_DB_NAME is exported
+    os.environ["MONGO_DB_NAME"] = args.mongo_db
+
+    # App log prints go to stderr so stdout stays pure JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Benchmark report written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
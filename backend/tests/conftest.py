@@ -0,0 +1,48 @@
+# GoodRoad/backend/tests/conftest.py
+# Services run against InMemoryRepository, so the suite needs no MongoDB:
+#   cd backend && python -m pytest -q
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("AI_TRANSPORT", "stub")
+
+import pytest
+
+from app.repositories.memory_repository import InMemoryRepository
+from app.repositories.provider import set_repository
+from app.services.penalty.penalty_service import PenaltyService, active_rules
+from app.services.penalty.profile_cache import profile_cache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def repo():
+    repository = InMemoryRepository()
+    set_repository(repository)
+    active_rules.invalidate()
+    profile_cache.clear()
+    yield repository
+    set_repository(None)
+    profile_cache.clear()
+
+
+@pytest.fixture
+def client(repo):
+    # No lifespan: the routes use the in-memory repository set by the repo fixture
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def penalties(repo):
+    return PenaltyService(repo)
+
+
+async def register(service, *plates):
+    for plate_no in plates:
+        await service.register_vehicle(plate_no, f"Driver {plate_no}", f"{plate_no.lower()}@example.com", "car")
@@ -0,0 +1,91 @@
+# GoodRoad/backend/tests/test_ai_client.py
+import pytest
+
+from app.services.ai.ai_client import AIClient, AIUnavailableError, CircuitBreaker, ModelNotFoundError, StubTransport
+
+
+def client(transport, threshold=3, reset_seconds=60, model_ttl=3600):
+    return AIClient(transport, model_ttl=model_ttl, breaker=CircuitBreaker(threshold, reset_seconds))
+
+
+def fail_times(ai, n):
+    for _ in range(n):
+        with pytest.raises(RuntimeError):
+            ai.generate("prompt")
+
+
+# --- A. CIRCUIT BREAKER ---
+def test_breaker_opens_after_the_threshold():
+    transport = StubTransport(fail=True)
+    ai = client(transport)
+
+    fail_times(ai, 3)
+    with pytest.raises(AIUnavailableError):
+        ai.generate("prompt")
+
+    assert ai.breaker.state == "open"
+    assert transport.calls == 3
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    breaker.opened_at -= 60
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_failed_trial_reopens_and_successful_trial_closes():
+    transport = StubTransport(fail=True)
+    ai = client(transport, threshold=2)
+    fail_times(ai, 2)
+
+    ai.breaker.opened_at -= 60
+    fail_times(ai, 1)
+    assert ai.breaker.state == "open"
+
+    ai.breaker.opened_at -= 60
+    transport.fail = False
+    ai.generate("prompt")
+    assert (ai.breaker.state, ai.breaker.failures) == ("closed", 0)
+
+
+# --- B. MODEL DISCOVERY ---
+def test_model_is_discovered_once_per_ttl():
+    transport = StubTransport(models=["models/other-pro", "models/gemini-1.5-flash"])
+    ai = client(transport)
+
+    for _ in range(3):
+        assert ai.generate("prompt").startswith("[stub:models/gemini-1.5-flash]")
+
+    assert transport.list_calls == 1
+    ai.model_ttl = 0
+    ai.generate("prompt")
+    assert transport.list_calls == 2
+
+
+def test_failures_keep_the_cached_model():
+    transport = StubTransport()
+    ai = client(transport, threshold=10)
+    ai.generate("prompt")
+
+    transport.fail = True
+    fail_times(ai, 3)
+
+    assert transport.list_calls == 1
+
+
+def test_retired_model_is_rediscovered():
+    transport = StubTransport(models=["models/gemini-1.5-flash"])
+    ai = client(transport)
+    ai.generate("prompt")
+
+    transport.models = ["models/gemini-2.0-flash"]
+    with pytest.raises(ModelNotFoundError):
+        ai.generate("prompt")
+
+    assert ai.generate("prompt").startswith("[stub:models/gemini-2.0-flash]")
+    assert transport.list_calls == 2
@@ -0,0 +1,50 @@
+# GoodRoad/backend/tests/test_analytics_service.py
+import pytest
+
+from app.services.analytics.analytics_service import AnalyticsService
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def fleet(repo, penalties):
+    """Active points 35 (Critical), 25 (High), 12 (Moderate), 5 and 0 (Low)."""
+    plates = {"CAB-1111": 35, "CAB-2222": 25, "CAB-3333": 12, "CAB-4444": 5, "CAB-5555": 0}
+    await register(penalties, *plates)
+    for plate_no, points in plates.items():
+        repo.summaries[plate_no]["active_points"] = points
+    return plates
+
+
+async def test_top_drivers_by_active_points(repo, fleet):
+    top = await AnalyticsService(repo).get_top_risk_drivers(limit=3)
+
+    assert [(d["plate_no"], d["risk_level"]) for d in top["drivers"]] == [
+        ("CAB-1111", "Critical"), ("CAB-2222", "High"), ("CAB-3333", "Moderate"),
+    ]
+    assert (await AnalyticsService(repo).get_top_risk_drivers(limit=1000))["limit"] == 100
+    assert len((await AnalyticsService(repo).get_top_risk_drivers(limit=1000))["drivers"]) == 4
+
+
+async def test_drivers_without_a_summary_count_as_low(repo, fleet):
+    await repo.insert_driver({"plate_no": "OLD-0001", "name": "Legacy", "upload_count": 0})
+
+    report = await AnalyticsService(repo).get_risk_distribution()
+
+    assert report["total_drivers"] == 6
+    assert {row["risk_level"]: row["drivers"] for row in report["distribution"]} == {
+        "Low": 3, "Moderate": 1, "High": 1, "Critical": 1,
+    }
+
+
+async def test_results_are_cached_until_they_expire(repo, fleet):
+    service = AnalyticsService(repo, cache_seconds=60)
+    before = await service.get_top_risk_drivers(limit=1)
+    repo.summaries["CAB-5555"]["active_points"] = 50
+
+    assert await service.get_top_risk_drivers(limit=1) == before
+    assert (await AnalyticsService(repo, cache_seconds=0).get_top_risk_drivers(limit=1))["drivers"][0]["plate_no"] == "CAB-5555"
+
+    service._cache = {key: (0, value) for key, (_, value) in service._cache.items()}
+    assert (await service.get_top_risk_drivers(limit=1))["drivers"][0]["plate_no"] == "CAB-5555"
@@ -0,0 +1,36 @@
+# GoodRoad/backend/tests/test_batch_violations.py
+import pytest
+
+from app.services.summary.summary_service import verify_summary
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_batch_counts_repeats_inside_the_batch(repo, penalties):
+    await register(penalties, "CAB-1111", "CAB-2222")
+    results = await penalties.add_violations_batch([
+        {"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"},
+        {"plate_no": "CAB-2222", "violation_code": "RED_LIGHT"},
+        {"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"},
+        {"plate_no": "NOT-THERE", "violation_code": "RED_LIGHT"},
+        {"plate_no": "CAB-1111", "violation_code": "BOGUS"},
+        {"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"},
+    ])
+
+    assert [r["status"] for r in results] == ["success", "success", "success", "error", "error", "success"]
+    assert [results[i]["violation"]["multiplier"] for i in (0, 2, 5)] == [1.0, 1.25, 1.5]
+    assert results[1]["violation"]["multiplier"] == 1.0
+    assert results[5]["violation"]["points"] == 7.5
+    assert repo.repeat_counts == {("CAB-1111", "RED_LIGHT"): 3, ("CAB-2222", "RED_LIGHT"): 1}
+
+
+async def test_single_adds_continue_the_batch_count(repo, penalties):
+    await register(penalties, "CAB-1111")
+    await penalties.add_violations_batch([{"plate_no": "CAB-1111", "violation_code": "WHITE_LINE"}] * 3)
+
+    fourth = await penalties.add_violation("CAB-1111", "WHITE_LINE")
+    fifth = await penalties.add_violation("CAB-1111", "WHITE_LINE")
+
+    assert (fourth["multiplier"], fifth["multiplier"]) == (1.0, 2.0)
+    assert await verify_summary(repo, "CAB-1111") is None
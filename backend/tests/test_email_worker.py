@@ -0,0 +1,99 @@
+# GoodRoad/backend/tests/test_email_worker.py
+from datetime import timedelta
+
+import pytest
+
+from app.models.records import EMAIL_DONE, EMAIL_FAILED, EMAIL_FALLBACK, EMAIL_PENDING
+from app.services.ai.ai_client import AIClient, StubTransport, set_ai_client
+from app.services.ai.email_worker import EmailWorkerPool
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def transport():
+    stub = StubTransport()
+    set_ai_client(AIClient(stub))
+    yield stub
+    set_ai_client(None)
+
+
+@pytest.fixture
+async def violation(repo, penalties):
+    await register(penalties, "CAB-1111")
+    return await penalties.add_violation("CAB-1111", "RED_LIGHT")
+
+
+def pool(repo, max_attempts=3):
+    return EmailWorkerPool(concurrency=1, lease_seconds=60, max_attempts=max_attempts, repository=repo)
+
+
+def expire_lease(repo):
+    for v in repo.violations.values():
+        if v.get("email_lease_until"):
+            v["email_lease_until"] -= timedelta(seconds=61)
+
+
+def stored(repo):
+    (v,) = repo.violations.values()
+    return v
+
+
+async def test_pending_email_is_generated_once(repo, transport, violation):
+    assert await pool(repo).run_once()
+    assert not await pool(repo).run_once()
+
+    v = stored(repo)
+    assert v["email_status"] == EMAIL_DONE
+    assert v["generated_email"].startswith("[stub:")
+    assert transport.calls == 1
+
+
+async def test_ai_failure_falls_back_to_the_template(repo, transport, violation):
+    transport.fail = True
+
+    await pool(repo).run_once()
+
+    v = stored(repo)
+    assert v["email_status"] == EMAIL_FALLBACK
+    assert "VIOLATION NOTICE" in v["generated_email"]
+
+
+async def test_crashed_worker_job_is_reclaimed_after_its_lease(repo, transport, violation):
+    crashed = pool(repo)
+    assert await crashed.claim_next() is not None
+    assert await pool(repo).claim_next() is None
+
+    expire_lease(repo)
+    assert await pool(repo).run_once()
+
+    v = stored(repo)
+    assert (v["email_status"], v["email_attempts"]) == (EMAIL_DONE, 2)
+
+
+async def test_holder_whose_lease_was_taken_over_cannot_complete(repo, transport, violation):
+    slow = await pool(repo).claim_next()
+    expire_lease(repo)
+    current = await pool(repo).claim_next()
+
+    transport.reply = "late"
+    await pool(repo).process(slow)
+    assert stored(repo)["email_status"] == EMAIL_PENDING
+
+    transport.reply = "current"
+    await pool(repo).process(current)
+    assert (stored(repo)["email_status"], stored(repo)["generated_email"]) == (EMAIL_DONE, "current")
+
+
+async def test_job_fails_after_max_attempts(repo, transport, violation):
+    for _ in range(2):
+        assert await pool(repo, max_attempts=2).claim_next() is not None
+        expire_lease(repo)
+
+    assert await pool(repo, max_attempts=2).run_once()
+
+    v = stored(repo)
+    assert (v["email_status"], v["generated_email"]) == (EMAIL_FAILED, None)
+    assert transport.calls == 0
+    assert not await pool(repo).run_once()
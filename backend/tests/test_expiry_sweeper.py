@@ -0,0 +1,74 @@
+# GoodRoad/backend/tests/test_expiry_sweeper.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.expiry.expiry_sweeper import ExpirySweeper
+from app.services.summary.summary_service import verify_summary
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def plate(repo, penalties):
+    # NO_SIGNAL expires after 60 days, RED_LIGHT after 180
+    await register(penalties, "CAB-1111")
+    await penalties.add_violations_batch([{"plate_no": "CAB-1111", "violation_code": "NO_SIGNAL"}] * 3)
+    await penalties.add_violation("CAB-1111", "RED_LIGHT")
+    return "CAB-1111"
+
+
+def sweeper(repo, lease_seconds=0):
+    return ExpirySweeper(interval=0, lease_seconds=lease_seconds, repository=repo)
+
+
+async def test_windows_move_each_expired_violation_once(repo, plate):
+    start = datetime.now()
+    await sweeper(repo).run_once(start)
+
+    nothing = await sweeper(repo).run_once(start + timedelta(days=30))
+    first = await sweeper(repo).run_once(start + timedelta(days=61))
+    again = await sweeper(repo).run_once(start + timedelta(days=62))
+
+    assert (nothing["plates"], first["plates"], again["plates"]) == (0, 1, 0)
+    assert first["points"] == 7.5
+    assert (repo.summaries[plate]["active_points"], repo.summaries[plate]["expired_points"]) == (5, 7.5)
+    assert await verify_summary(repo, plate) is None
+
+
+async def test_expiry_records_the_risk_transition(repo, plate):
+    start = datetime.now()
+    await sweeper(repo).run_once(start)
+    report = await sweeper(repo).run_once(start + timedelta(days=61))
+
+    assert report["transitions"] == 1
+    (transition,) = repo.risk_transitions
+    assert (transition["from_level"], transition["to_level"]) == ("Moderate", "Low")
+
+
+async def test_retried_window_does_not_move_points_twice(repo, plate, monkeypatch):
+    start = datetime.now()
+    await sweeper(repo).run_once(start)
+
+    async def transitions_down(transitions):
+        raise RuntimeError("transitions down")
+
+    monkeypatch.setattr(repo, "record_risk_transitions", transitions_down)
+    with pytest.raises(RuntimeError):
+        await sweeper(repo).run_once(start + timedelta(days=61))
+    monkeypatch.undo()
+
+    retry = await sweeper(repo).run_once(start + timedelta(days=200))
+
+    assert retry["points"] == 5
+    assert (repo.summaries[plate]["active_points"], repo.summaries[plate]["expired_points"]) == (0, 12.5)
+    assert await verify_summary(repo, plate) is None
+
+
+async def test_leased_sweep_is_skipped(repo, plate):
+    start = datetime.now()
+    await sweeper(repo).run_once(start)
+    await repo.claim_expiry_sweep(start + timedelta(days=1), start + timedelta(days=1, minutes=5))
+
+    assert await sweeper(repo).run_once(start + timedelta(days=1, minutes=1)) is None
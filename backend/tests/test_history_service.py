@@ -0,0 +1,37 @@
+# GoodRoad/backend/tests/test_history_service.py
+import pytest
+
+from app.services.history.history_service import HistoryService
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_keyset_pages_cover_the_history_once(repo, penalties):
+    await register(penalties, "CAB-1111")
+    # One batch shares a timestamp, so pages must break ties on _id
+    await penalties.add_violations_batch([{"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"}] * 15)
+    await penalties.add_violation("CAB-1111", "NO_SIGNAL")
+    await penalties.add_violations_batch([{"plate_no": "CAB-1111", "violation_code": "WHITE_LINE"}] * 9)
+    history = HistoryService(repo)
+
+    pages, cursor = [], None
+    while True:
+        page = await history.get_violation_history("CAB-1111", limit=10, cursor=cursor)
+        pages.append([item["_id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    newest_first = [str(i) for _, i in reversed(repo.by_plate_timestamp["CAB-1111"])]
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert [i for p in pages for i in p] == newest_first
+
+
+async def test_history_of_unknown_plate_and_bad_cursor(repo, penalties):
+    await register(penalties, "CAB-1111")
+    history = HistoryService(repo)
+
+    assert await history.get_violation_history("NOT-THERE") is None
+    with pytest.raises(ValueError):
+        await history.get_violation_history("CAB-1111", cursor="not-a-cursor")
@@ -0,0 +1,102 @@
+# GoodRoad/backend/tests/test_ingestion_service.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.ingestion.ingestion_service import IngestionService
+from app.services.summary.summary_service import verify_summary
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+# Incidents an hour ago; `minutes` shifts an event from there
+INCIDENT = (datetime.now() - timedelta(hours=1)).replace(microsecond=0)
+
+
+def event(event_id, plate_no="CAB-1111", minutes=0, violation_type="RED_LIGHT", at=None):
+    return {
+        "eventId": event_id, "plateNo": plate_no, "violationType": violation_type,
+        "eventTime": (at or INCIDENT + timedelta(minutes=minutes)).isoformat(), "reporterPlateNo": "REP-0001",
+    }
+
+
+@pytest.fixture
+async def ingestion(repo, penalties):
+    await register(penalties, "CAB-1111", "REP-0001")
+    return IngestionService(repo)
+
+
+async def test_retried_event_id_is_scored_once(repo, ingestion):
+    first = await ingestion.ingest(event("evt-1"))
+    retry = await ingestion.ingest(event("evt-1"))
+
+    assert first["status"] == "accepted"
+    assert retry == {
+        "status": "duplicate", "event_id": "evt-1",
+        "original_status": "accepted", "violation_id": first["violation"]["_id"],
+    }
+    assert len(repo.violations) == 1
+    assert repo.drivers["REP-0001"]["upload_count"] == 1
+
+
+async def test_same_incident_within_the_window_is_a_near_duplicate(repo, ingestion):
+    await ingestion.ingest(event("evt-1"))
+    near = await ingestion.ingest(event("evt-2", minutes=1.5))
+    other_type = await ingestion.ingest(event("evt-3", minutes=1.5, violation_type="NO_SIGNAL"))
+    later = await ingestion.ingest(event("evt-4", minutes=5))
+
+    assert near == {"status": "near_duplicate", "event_id": "evt-2", "duplicate_of": "evt-1"}
+    assert other_type["status"] == "accepted"
+    assert later["status"] == "accepted"
+    assert len(repo.violations) == 3
+
+
+async def test_rejected_event_frees_its_event_id(repo, penalties, ingestion):
+    with pytest.raises(ValueError):
+        await ingestion.ingest(event("evt-1", plate_no="NEW-0001"))
+    assert await repo.find_violation_event("evt-1") is None
+
+    await register(penalties, "NEW-0001")
+    assert (await ingestion.ingest(event("evt-1", plate_no="NEW-0001")))["status"] == "accepted"
+
+
+async def test_failure_after_scoring_keeps_the_event_claimed(repo, ingestion, monkeypatch):
+    async def ledger_down(entries):
+        raise RuntimeError("ledger down")
+
+    monkeypatch.setattr(repo, "record_revenue", ledger_down)
+    with pytest.raises(RuntimeError):
+        await ingestion.ingest(event("evt-1"))
+    monkeypatch.undo()
+
+    retry = await ingestion.ingest(event("evt-1"))
+    (violation_id,) = repo.violations
+    assert retry["status"] == "duplicate"
+    assert retry["violation_id"] == str(violation_id)
+    assert len(repo.violations) == 1
+
+
+async def test_violation_is_dated_when_it_happened(repo, ingestion):
+    happened = INCIDENT - timedelta(days=3)
+    await ingestion.ingest(event("evt-1"))
+    accepted = await ingestion.ingest(event("evt-2", at=happened))
+
+    assert accepted["violation"]["timestamp"] == happened
+    assert accepted["violation"]["expiry_date"] == happened + timedelta(days=180)
+    assert await verify_summary(repo, "CAB-1111") is None
+
+
+async def test_future_event_time_is_capped_at_now(repo, ingestion):
+    accepted = await ingestion.ingest(event("evt-1", at=datetime.now() + timedelta(days=1)))
+
+    assert accepted["violation"]["timestamp"] <= datetime.now()
+
+
+async def test_event_already_past_its_expiry_is_rejected(repo, ingestion):
+    with pytest.raises(ValueError):
+        await ingestion.ingest(event("evt-1", violation_type="NO_SIGNAL", at=INCIDENT - timedelta(days=61)))
+
+    assert repo.violations == {}
+    assert repo.repeat_counts.get(("CAB-1111", "NO_SIGNAL"), 0) == 0
+    assert await repo.find_violation_event("evt-1") is None
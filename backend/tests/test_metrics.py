@@ -0,0 +1,47 @@
+# GoodRoad/backend/tests/test_metrics.py
+from app.services.metrics.metrics import MetricsRegistry, http_requests
+
+
+def test_counters_render_in_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("jobs_total", "Jobs by outcome.", ("outcome",))
+    requests.inc(outcome="ok")
+    requests.inc(2, outcome='say "hi"')
+
+    assert registry.render() == (
+        "# HELP jobs_total Jobs by outcome.\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{outcome="ok"} 1\n'
+        'jobs_total{outcome="say \\"hi\\""} 2\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("step_seconds", "Step latency.", ("step",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, step="load")
+
+    lines = registry.render().splitlines()
+
+    assert lines[2:] == [
+        'step_seconds_bucket{step="load",le="0.1"} 2',
+        'step_seconds_bucket{step="load",le="1.0"} 3',
+        'step_seconds_bucket{step="load",le="+Inf"} 4',
+        'step_seconds_sum{step="load"} 3.65',
+        'step_seconds_count{step="load"} 4',
+    ]
+
+
+def test_requests_are_labelled_with_the_route_template(client):
+    route = "/api/penalty/user/{plate_no}/full_profile"
+    before = http_requests.value(method="GET", route=route, status="404")
+
+    client.get("/api/penalty/user/CAB-9999/full_profile")
+    client.get("/api/no/such/path")
+
+    assert http_requests.value(method="GET", route=route, status="404") == before + 1
+    assert http_requests.value(method="GET", route="unmatched", status="404") >= 1
+    body = client.get("/api/metrics").text
+    assert f'route="{route}"' in body
+    assert "CAB-9999" not in body
@@ -0,0 +1,48 @@
+# GoodRoad/backend/tests/test_profile_cache.py
+import json
+
+import pytest
+
+from app.services.penalty.profile_cache import profile_cache
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+def cache_status(client, plate_no):
+    return client.get(f"/api/penalty/user/{plate_no}/full_profile").headers["X-Cache"]
+
+
+async def test_new_violation_invalidates_the_cached_profile(repo, penalties, client):
+    await register(penalties, "CAB-1111")
+    assert (cache_status(client, "CAB-1111"), cache_status(client, "CAB-1111")) == ("MISS", "HIT")
+
+    await penalties.add_violation("CAB-1111", "RED_LIGHT")
+
+    response = client.get("/api/penalty/user/CAB-1111/full_profile")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["stats"]["total_violations"] == 1
+
+
+async def test_batch_invalidates_every_plate_it_touched(repo, penalties, client):
+    await register(penalties, "CAB-1111", "CAB-2222", "CAB-3333")
+    for plate_no in ("CAB-1111", "CAB-2222", "CAB-3333"):
+        cache_status(client, plate_no)
+
+    await penalties.add_violations_batch([
+        {"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"},
+        {"plate_no": "CAB-2222", "violation_code": "RED_LIGHT"},
+    ])
+
+    assert [cache_status(client, p) for p in ("CAB-1111", "CAB-2222", "CAB-3333")] == ["MISS", "MISS", "HIT"]
+
+
+async def test_load_racing_a_write_is_not_cached(repo, penalties):
+    await register(penalties, "CAB-1111")
+    profile_cache.begin("CAB-1111")
+    body, valid_until = await penalties.load_profile("CAB-1111")
+
+    await penalties.add_violation("CAB-1111", "RED_LIGHT")
+    profile_cache.put("CAB-1111", json.dumps(body, default=str).encode(), valid_until)
+
+    assert profile_cache.get("CAB-1111") is None
@@ -0,0 +1,49 @@
+# GoodRoad/backend/tests/test_repeat_counters.py
+import pytest
+
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_rebuilt_counters_match_the_stored_violations(repo, penalties):
+    await register(penalties, "CAB-1111")
+    await penalties.add_violations_batch([{"plate_no": "CAB-1111", "violation_code": "NO_HELMET"}] * 2)
+    repo.repeat_counts.clear()
+
+    await repo.rebuild_repeat_counts("CAB-1111")
+
+    assert (await penalties.add_violation("CAB-1111", "NO_HELMET"))["multiplier"] == 1.5
+
+
+async def test_failed_single_insert_gives_its_count_back(repo, penalties, monkeypatch):
+    await register(penalties, "CAB-1111")
+
+    async def insert_down(violation):
+        raise ConnectionError("primary stepped down")
+
+    monkeypatch.setattr(repo, "insert_violation", insert_down)
+    with pytest.raises(ConnectionError):
+        await penalties.add_violation("CAB-1111", "RED_LIGHT")
+
+    assert repo.repeat_counts[("CAB-1111", "RED_LIGHT")] == 0
+
+
+async def test_failed_batch_insert_gives_every_count_back(repo, penalties, monkeypatch):
+    await register(penalties, "CAB-1111", "CAB-2222")
+    await penalties.add_violation("CAB-1111", "RED_LIGHT")
+
+    async def insert_down(violations):
+        raise ConnectionError("primary stepped down")
+
+    monkeypatch.setattr(repo, "insert_violations", insert_down)
+    with pytest.raises(ConnectionError):
+        await penalties.add_violations_batch([
+            {"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"},
+            {"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"},
+            {"plate_no": "CAB-2222", "violation_code": "NO_SIGNAL"},
+        ])
+    monkeypatch.undo()
+
+    assert repo.repeat_counts == {("CAB-1111", "RED_LIGHT"): 1, ("CAB-2222", "NO_SIGNAL"): 0}
+    assert (await penalties.add_violation("CAB-1111", "RED_LIGHT"))["multiplier"] == 1.25
@@ -0,0 +1,38 @@
+# GoodRoad/backend/tests/test_repositories.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.repositories.base import PenaltyRepository
+from app.repositories.memory_repository import InMemoryRepository
+
+pytestmark = pytest.mark.anyio
+
+
+def legacy_violation(plate_no, points=5, days=180):
+    """A violation stored directly, the way records written before summaries existed look."""
+    now = datetime.now()
+    return {
+        "plate_no": plate_no, "type": "RED_LIGHT", "label": "Red Light Violation", "weight": 5,
+        "multiplier": 1.0, "points": points, "timestamp": now, "expiry_date": now + timedelta(days=days),
+    }
+
+
+def test_backend_missing_a_method_fails_when_constructed():
+    class FindOnly(PenaltyRepository):
+        async def find_driver(self, plate_no):
+            return None
+
+    with pytest.raises(TypeError):
+        FindOnly()
+    InMemoryRepository()
+
+
+async def test_missing_summary_is_built_from_the_raw_records(repo):
+    for points in (5, 6.25, 3):
+        await repo.insert_violation(legacy_violation("OLD-0001", points))
+
+    summary = await repo.get_summary("OLD-0001")
+
+    assert (summary["total_violations"], summary["active_points"]) == (3, 14.25)
+    assert repo.summaries["OLD-0001"]["total_violations"] == 3
@@ -0,0 +1,53 @@
+# GoodRoad/backend/tests/test_rescoring.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.penalty.penalty_service import DEFAULT_RULE_SET
+
+np = pytest.importorskip("numpy")
+
+from app.services.rules.rescoring import COLUMNS, score_chunk
+
+
+def chunk_of(rows):
+    """Columnar chunk from (plate_no, type, multiplier) rows, already in scan order."""
+    start = datetime(2026, 1, 1)
+    chunk = {column: [] for column in COLUMNS}
+    for n, (plate_no, violation_type, multiplier) in enumerate(rows):
+        rule = DEFAULT_RULE_SET.rules.get(violation_type, {"weight": 1, "expiry": 0})
+        timestamp = start + timedelta(hours=n)
+        chunk["_id"].append(n)
+        chunk["plate_no"].append(plate_no)
+        chunk["type"].append(violation_type)
+        chunk["timestamp"].append(timestamp)
+        chunk["weight"].append(rule["weight"])
+        chunk["multiplier"].append(multiplier)
+        chunk["points"].append(rule["weight"] * multiplier)
+        chunk["expiry_date"].append(timestamp + timedelta(days=rule["expiry"]))
+    return chunk
+
+
+def test_repeat_count_restarts_for_each_plate_and_type():
+    chunk = chunk_of([
+        ("CAB-1111", "RED_LIGHT", 1.0), ("CAB-1111", "RED_LIGHT", 1.25), ("CAB-1111", "RED_LIGHT", 1.5),
+        ("CAB-1111", "RED_LIGHT", 1.0), ("CAB-1111", "RED_LIGHT", 2.0), ("CAB-1111", "WHITE_LINE", 1.0),
+        ("CAB-2222", "WHITE_LINE", 1.0), ("CAB-2222", "WHITE_LINE", 1.25),
+    ])
+
+    scores = score_chunk(chunk, DEFAULT_RULE_SET)
+
+    assert scores["multiplier"].tolist() == [1.0, 1.25, 1.5, 1.0, 2.0, 1.0, 1.0, 1.25]
+    assert scores["points"].tolist() == [5, 6.25, 7.5, 5, 10, 3, 3, 3.75]
+    assert not scores["changed"].any()
+
+
+def test_changed_and_unknown_rows_are_flagged():
+    chunk = chunk_of([
+        ("CAB-1111", "RED_LIGHT", 1.0), ("CAB-1111", "RED_LIGHT", 1.0), ("CAB-1111", "RETIRED_CODE", 1.0),
+    ])
+
+    scores = score_chunk(chunk, DEFAULT_RULE_SET)
+
+    assert scores["changed"].tolist() == [False, True, False]
+    assert scores["known"].tolist() == [True, True, False]
@@ -0,0 +1,97 @@
+# GoodRoad/backend/tests/test_revenue_service.py
+from datetime import date, datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+from app.models.records import ledger_entry
+from app.services.penalty.penalty_service import calculate_penalty_split
+from app.services.revenue.revenue_service import RevenueService, bucket_plan
+from tests.conftest import register
+
+
+def entry(timestamp, points=5):
+    violation = {"_id": ObjectId(), "plate_no": "CAB-1111", "type": "RED_LIGHT", "points": points, "timestamp": timestamp}
+    return ledger_entry(violation, calculate_penalty_split(points))
+
+
+# --- A. BUCKET PLAN ---
+def test_whole_months_are_read_as_month_buckets():
+    plan = bucket_plan(date(2026, 1, 30), date(2026, 4, 2))
+
+    assert plan == [
+        ("day", "2026-01-30"), ("day", "2026-01-31"),
+        ("month", "2026-02"), ("month", "2026-03"),
+        ("day", "2026-04-01"), ("day", "2026-04-02"),
+    ]
+
+
+def test_range_inside_one_month_is_read_by_day():
+    assert bucket_plan(date(2026, 3, 1), date(2026, 3, 3)) == [
+        ("day", "2026-03-01"), ("day", "2026-03-02"), ("day", "2026-03-03"),
+    ]
+    assert bucket_plan(date(2026, 3, 1), date(2026, 3, 31)) == [("month", "2026-03")]
+
+
+def test_leap_february_ends_on_the_29th():
+    assert bucket_plan(date(2028, 2, 1), date(2028, 2, 29)) == [("month", "2028-02")]
+    assert bucket_plan(date(2028, 2, 1), date(2028, 2, 28))[-1] == ("day", "2028-02-28")
+
+
+# --- B. TOTALS, LEDGER AND RECONCILIATION ---
+@pytest.mark.anyio
+async def test_totals_match_the_ledger(repo):
+    entries = [entry(datetime(2026, 1, 31, 23)), entry(datetime(2026, 2, 14), 7.5), entry(datetime(2026, 3, 1, 8), 3)]
+    await repo.record_revenue(entries)
+
+    report = await RevenueService(repo).get_totals(date(2026, 1, 31), date(2026, 2, 28))
+
+    assert report["buckets_read"] == 2
+    assert report["totals"]["violations"] == 2
+    assert report["totals"]["total"] == round(sum(e["total"] for e in entries[:2]), 2)
+
+
+@pytest.mark.anyio
+async def test_entries_already_in_the_ledger_are_not_counted_twice(repo):
+    first, second = entry(datetime(2026, 2, 14)), entry(datetime(2026, 2, 15))
+    await repo.record_revenue([first])
+    await repo.record_revenue([first, second])
+
+    report = await RevenueService(repo).get_totals(date(2026, 2, 1), date(2026, 2, 28))
+
+    assert report["totals"]["violations"] == 2
+    assert await RevenueService(repo).reconcile() == []
+
+
+@pytest.mark.anyio
+async def test_reconcile_reports_and_fixes_drift(repo):
+    await repo.record_revenue([entry(datetime(2026, 2, 14)), entry(datetime(2026, 3, 2))])
+    repo.revenue_rollups[("day", "2026-02-14")]["total"] += 100
+    service = RevenueService(repo)
+
+    mismatches = await service.reconcile(since=datetime(2026, 2, 10), fix=True)
+
+    assert [(m["period"], m["key"]) for m in mismatches] == [("day", "2026-02-14")]
+    assert mismatches[0]["stored"]["total"] - mismatches[0]["expected"]["total"] == 100
+    assert await service.reconcile() == []
+
+
+@pytest.mark.anyio
+async def test_backfill_adds_only_missing_ledger_entries(repo, penalties, monkeypatch):
+    await register(penalties, "CAB-1111")
+    await penalties.add_violations_batch([{"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"}] * 2)
+
+    async def ledger_down(entries):
+        raise ConnectionError("ledger down")
+
+    # Crash between the violation insert and the ledger write
+    monkeypatch.setattr(repo, "record_revenue", ledger_down)
+    with pytest.raises(ConnectionError):
+        await penalties.add_violation("CAB-1111", "RED_LIGHT")
+    monkeypatch.undo()
+    service = RevenueService(repo)
+
+    assert await service.backfill_ledger() == 1
+    assert await service.backfill_ledger() == 0
+    assert set(repo.revenue_ledger) == set(repo.violations)
+    assert await service.reconcile() == []
@@ -0,0 +1,43 @@
+# GoodRoad/backend/tests/test_rule_sets.py
+from datetime import datetime
+
+import pytest
+
+from app.services.penalty.penalty_service import DEFAULT_RULE_SET, VIOLATION_RULES, active_rules
+from app.services.rules.rule_sets import activate_rule_set, insert_rule_set
+from tests.conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+async def store_version(repo, weight):
+    rules = {**VIOLATION_RULES, "RED_LIGHT": {**VIOLATION_RULES["RED_LIGHT"], "weight": weight}}
+    return await insert_rule_set(repo, rules, DEFAULT_RULE_SET.multiplier_tiers, note=f"RED_LIGHT = {weight}")
+
+
+async def test_new_violations_are_scored_with_the_activated_version(repo, penalties):
+    await register(penalties, "CAB-1111")
+    version = await store_version(repo, 8)
+    await activate_rule_set(repo, version)
+    active_rules.invalidate()
+
+    violation = await penalties.add_violation("CAB-1111", "RED_LIGHT")
+
+    assert (violation["rule_version"], violation["points"]) == (version, 8)
+
+
+async def test_most_recent_activation_wins_while_two_are_active(repo):
+    v2, v3 = await store_version(repo, 8), await store_version(repo, 9)
+    await activate_rule_set(repo, v2)
+    # Mid-activation of v3: already active, v2 not yet deactivated
+    repo.rule_sets[v3].update({"active": True, "activated_at": datetime.now()})
+
+    assert (await repo.find_rule_set())["version"] == v3
+
+    await activate_rule_set(repo, v2)
+    assert [doc["version"] for doc in repo.rule_sets.values() if doc["active"]] == [v2]
+
+
+async def test_unknown_version_is_rejected(repo):
+    with pytest.raises(ValueError):
+        await activate_rule_set(repo, 42)
@@ -0,0 +1,65 @@
+# GoodRoad/backend/tests/test_summaries.py
+from datetime import datetime
+
+import pytest
+
+from app.services.ingestion.ingestion_service import IngestionService
+from app.services.summary.summary_service import verify_summary
+from tests.conftest import register
+from tests.test_repositories import legacy_violation
+
+pytestmark = pytest.mark.anyio
+
+
+async def register_legacy(repo, plate_no, violations=0):
+    """A driver and history written before summaries existed: no summary document."""
+    await repo.insert_driver({"plate_no": plate_no, "name": plate_no, "email": "legacy@example.com", "upload_count": 0})
+    for _ in range(violations):
+        await repo.insert_violation(legacy_violation(plate_no))
+
+
+async def test_profile_is_served_from_the_summary(repo, penalties):
+    await register(penalties, "CAB-1111")
+    await penalties.add_violations_batch([{"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"}] * 2)
+    await penalties.add_violation("CAB-1111", "NO_SIGNAL")
+
+    stats = (await penalties.get_full_profile("CAB-1111"))["stats"]
+
+    assert (stats["total_violations"], stats["active_points"], stats["risk_level"]) == (3, 13.25, "Moderate")
+    assert await verify_summary(repo, "CAB-1111") is None
+
+
+async def test_first_violation_keeps_the_legacy_history(repo, penalties):
+    await register_legacy(repo, "OLD-0001", violations=3)
+
+    await penalties.add_violation("OLD-0001", "RED_LIGHT")
+
+    assert (await penalties.get_full_profile("OLD-0001"))["stats"]["total_violations"] == 4
+    assert await verify_summary(repo, "OLD-0001") is None
+
+
+async def test_first_batch_keeps_the_legacy_history(repo, penalties):
+    await register_legacy(repo, "OLD-0001", violations=2)
+    await register(penalties, "CAB-1111")
+
+    await penalties.add_violations_batch([
+        {"plate_no": "OLD-0001", "violation_code": "RED_LIGHT"},
+        {"plate_no": "CAB-1111", "violation_code": "RED_LIGHT"},
+    ])
+
+    assert repo.summaries["OLD-0001"]["total_violations"] == 3
+    assert await verify_summary(repo, "OLD-0001") is None
+
+
+async def test_first_reward_keeps_the_legacy_history(repo, penalties):
+    await register_legacy(repo, "OLD-0001", violations=2)
+    await register(penalties, "CAB-1111")
+
+    await IngestionService(repo).ingest({
+        "eventId": "evt-1", "plateNo": "CAB-1111", "violationType": "RED_LIGHT",
+        "eventTime": datetime.now().isoformat(), "reporterPlateNo": "OLD-0001",
+    })
+
+    summary = repo.summaries["OLD-0001"]
+    assert (summary["total_violations"], summary["total_contributions"]) == (2, 1)
+    assert await verify_summary(repo, "OLD-0001") is None
@@ -70,6 +70,19 @@ const ViolationForm = ({ activePlate, onViolationAdded }) => {
         });
     };
 
+    // Poll the backend until the background worker has generated the AI email
+    const waitForEmail = async (violationId, attempts = 30) => {
+        for (let i = 0; i < attempts; i++) {
+            const res = await fetch(`http://127.0.0.1:8000/api/penalty/violation/${violationId}/email`);
+            if (res.ok) {
+                const status = await res.json();
+                if (status.email_status !== 'pending') return status;
+            }
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+        }
+        throw new Error("Timed out waiting for AI email");
+    };
+
     // Calculate penalty split (Government 60%, Reward 25%, System 15%)
     const calculatePenaltySplit = (totalPenalty) => {
         return {
@@ -113,10 +126,16 @@ const ViolationForm = ({ activePlate, onViolationAdded }) => {
                 
                 setMsg(`✅ SUCCESS! Points: ${data.points} | Sending email to: ${data.driver_email}...`);
                 
-                // Send email notification after a brief delay to show penalty split first
-                setTimeout(() => {
-                    sendInstantEmail(data);
-                }, 500);
+                // Send email notification once the AI email is ready
+                waitForEmail(data._id)
+                    .then((status) => {
+                        const ready = { ...data, generated_email: status.generated_email };
+                        setViolationData(ready);
+                        return sendInstantEmail(ready);
+                    })
+                    .catch((err) => {
+                        setEmailStatus({ success: false, message: err.message || "Email generation failed" });
+                    });
 
                 if (onViolationAdded) onViolationAdded(targetPlate);
                 // Keep the plate number visible - don't clear it